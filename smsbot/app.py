@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Optional
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+import rag_service
+from config import Config
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+app = FastAPI()
+
+
+class SmsRequest(BaseModel):
+    payload: str = ""
+    corpus: Optional[str] = None
+
+
+class SmsResponse(BaseModel):
+    message: str
+
+
+@app.on_event("startup")
+async def load_index():
+    # Load the shared encoder and every corpus index before the first request instead of during it
+    await asyncio.get_running_loop().run_in_executor(rag_service.retrieval_executor, rag_service.load_all)
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    await rag_service.aclose()
+
+
+async def answer(request: SmsRequest, corpus: Optional[str]) -> SmsResponse:
+    logger.info(f"The received message for {corpus or Config.DEFAULT_CORPUS} is {request.payload}")
+    try:
+        message = await rag_service.execute(request.payload, corpus)
+    except rag_service.UnknownCorpusError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown corpus: {e.name}")
+    except rag_service.CorpusUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Corpus {e.name} is unavailable")
+    return SmsResponse(message=message)
+
+
+@app.get("/stats")
+async def stats():
+    # Per worker process, each worker has its own in-memory caches
+    return rag_service.cache_stats()
+
+
+@app.post("/smsbot", response_model=SmsResponse)
+async def send_sms(request: SmsRequest):
+    return await answer(request, request.corpus)
+
+
+@app.post("/smsbot/{corpus}", response_model=SmsResponse)
+async def send_sms_to_corpus(corpus: str, request: SmsRequest):
+    return await answer(request, corpus)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    # Build missing indexes once here so the workers don't race to create them
+    rag_service.build_all_if_missing()
+    uvicorn.run("app:app", host=Config.HOST, port=Config.PORT, workers=Config.WORKERS)
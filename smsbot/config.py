@@ -0,0 +1,45 @@
+from dotenv import load_dotenv
+import os
+
+# Load environment variables from .env file
+load_dotenv()
+
+
+class Config:
+    # ASGI server settings, each worker is a separate process with its own copy of the index
+    HOST = os.getenv("SMSBOT_HOST", "0.0.0.0")
+    PORT = int(os.getenv("SMSBOT_PORT", "8081"))
+    WORKERS = int(os.getenv("SMSBOT_WORKERS", "4"))
+
+    # Groq answer generation
+    GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+    MODEL = os.getenv("SMSBOT_MODEL", "llama3-70b-8192")
+    TEMPERATURE = float(os.getenv("SMSBOT_TEMPERATURE", "0.2"))
+    MAX_TOKENS = int(os.getenv("SMSBOT_MAX_TOKENS", "1000"))
+
+    # Corpora served by this process, see corpora.json. Requests without a corpus use the default
+    CORPORA_PATH = os.getenv("SMSBOT_CORPORA_PATH", os.path.join(os.path.dirname(__file__), "corpora.json"))
+    DEFAULT_CORPUS = os.getenv("SMSBOT_DEFAULT_CORPUS", "magik")
+
+    # Retrieval, one embedding model shared by all corpora
+    EMBEDDING_MODEL = os.getenv("SMSBOT_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    # Each corpus is persisted in its own subdirectory unless corpora.json sets persist_directory
+    PERSIST_DIRECTORY = os.getenv("SMSBOT_PERSIST_DIRECTORY", "embeddings")
+    # "chroma", or "mmap" for the memory-mapped vector matrix built by ingest.py or convert_chroma.py
+    RETRIEVAL_BACKEND = os.getenv("SMSBOT_RETRIEVAL_BACKEND", "chroma")
+    INDEX_DIRECTORY = os.getenv("SMSBOT_INDEX_DIRECTORY", "indexes")
+    INDEX_DTYPE = os.getenv("SMSBOT_INDEX_DTYPE", "float16")
+    # How often workers check for an index version published by ingest.py
+    INDEX_RELOAD_SECONDS = float(os.getenv("SMSBOT_INDEX_RELOAD_SECONDS", "30"))
+    CHUNK_SIZE = int(os.getenv("SMSBOT_CHUNK_SIZE", "1000"))
+    CHUNK_OVERLAP = int(os.getenv("SMSBOT_CHUNK_OVERLAP", "200"))
+    TOP_K = int(os.getenv("SMSBOT_TOP_K", "5"))
+    # Threads running the blocking similarity search, per worker
+    RETRIEVAL_THREADS = int(os.getenv("SMSBOT_RETRIEVAL_THREADS", "4"))
+
+    # Caches in execute(): retrieved chunks per normalized query, and answers per query, chunks and prompt version
+    QUERY_CACHE_SIZE = int(os.getenv("SMSBOT_QUERY_CACHE_SIZE", "2048"))
+    ANSWER_CACHE_SIZE = int(os.getenv("SMSBOT_ANSWER_CACHE_SIZE", "2048"))
+    ANSWER_CACHE_TTL_SECONDS = float(os.getenv("SMSBOT_ANSWER_CACHE_TTL_SECONDS", str(24 * 3600)))
+    # sqlite file shared by the workers, empty keeps answers in memory only
+    ANSWER_CACHE_PATH = os.getenv("SMSBOT_ANSWER_CACHE_PATH", "cache/answers.sqlite3")
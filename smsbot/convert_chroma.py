@@ -0,0 +1,43 @@
+"""
+Converts existing Chroma embeddings directories to the memory-mapped index format.
+
+The stored vectors are reused as they are, nothing is re-embedded. Afterwards set
+"backend": "mmap" for the corpus in corpora.json (or SMSBOT_RETRIEVAL_BACKEND=mmap).
+
+Usage (from the smsbot directory):
+    python convert_chroma.py [--corpus magik] [--dtype float16]
+"""
+import argparse
+import logging
+import numpy as np
+from langchain.vectorstores import Chroma
+from config import Config
+from mmap_index import write_index
+from rag_service import corpora, get_embedding_function
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def convert(persist_directory: str, index_directory: str, dtype: str) -> int:
+    vectorstore = Chroma(persist_directory=persist_directory, embedding_function=get_embedding_function())
+    data = vectorstore._collection.get(include=["embeddings", "documents"])
+    vectors = np.asarray(data["embeddings"], dtype=np.float32)
+    write_index(index_directory, data["ids"], data["documents"], vectors, Config.EMBEDDING_MODEL, dtype)
+    return len(data["ids"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", action="append", help="corpus to convert, may be repeated (default: all)")
+    parser.add_argument("--dtype", default=Config.INDEX_DTYPE, choices=["float16", "float32"])
+    args = parser.parse_args()
+
+    for name in args.corpus or list(corpora):
+        corpus = corpora[name]
+        count = convert(corpus.persist_directory, corpus.index_directory, args.dtype)
+        logger.info(f"Converted {count} {name} chunks from {corpus.persist_directory} to {corpus.index_directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Incremental, content-hashed ingestion of the corpus PDFs into the mmap index.
+
+Every chunk is identified by the hash of its text, so re-running after a PDF
+edit only embeds the chunks that changed: vectors of unchanged chunks are copied
+from the live index and chunks no longer in the PDF are dropped. The new index
+is written to its own version directory while the server keeps serving the old
+one, then published with an atomic swap of CURRENT. Running workers pick it up
+within SMSBOT_INDEX_RELOAD_SECONDS.
+
+Usage (from the smsbot directory):
+    python ingest.py [--corpus magik] [--pdf path/to/new.pdf] [--keep 2] [--force]
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Sequence, Tuple
+import numpy as np
+from langchain.document_loaders import PyPDFLoader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from config import Config
+from mmap_index import MmapIndex, publish_version, version_directory, write_index
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def load_chunks(pdf_path: str) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Splits the PDF into chunks and returns (chunk ids, chunk texts, page hashes).
+
+    A chunk id is the hash of its text, with a counter for repeated chunks so ids
+    stay unique. The page hashes are only used to report what changed.
+    """
+    pages = PyPDFLoader(pdf_path).load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=Config.CHUNK_SIZE, chunk_overlap=Config.CHUNK_OVERLAP)
+    texts = [doc.page_content for doc in text_splitter.split_documents(pages)]
+    seen: Counter = Counter()
+    ids = []
+    for text in texts:
+        digest = content_hash(text)
+        ids.append(f"{digest}-{seen[digest]}" if seen[digest] else digest)
+        seen[digest] += 1
+    return ids, texts, [content_hash(page.page_content) for page in pages]
+
+
+def ingest(pdf_path: str, index_directory: str, embed_documents: Callable[[List[str]], Sequence[Sequence[float]]],
+           dtype: str = Config.INDEX_DTYPE, keep: int = 2, force: bool = False) -> Dict[str, int]:
+    """
+    Brings the index in index_directory up to date with the PDF and publishes it.
+    Returns the number of kept, embedded and removed chunks and changed pages.
+    """
+    ids, texts, page_hashes = load_chunks(pdf_path)
+
+    previous = MmapIndex(index_directory) if MmapIndex.exists(index_directory) else None
+    # Vectors from another embedding model or chunking can't be mixed with new ones
+    reusable = (previous is not None and not force
+                and previous.meta.get("embedding_model") == Config.EMBEDDING_MODEL
+                and previous.meta.get("chunking") == [Config.CHUNK_SIZE, Config.CHUNK_OVERLAP])
+    previous_rows = {chunk_id: row for row, chunk_id in enumerate(previous.ids)} if reusable else {}
+    previous_pages = set(previous.meta.get("page_hashes", [])) if reusable else set()
+
+    stats = {
+        "kept": sum(chunk_id in previous_rows for chunk_id in ids),
+        "embedded": sum(chunk_id not in previous_rows for chunk_id in ids),
+        "removed": len(set(previous_rows) - set(ids)) if reusable else len(previous or []),
+        "changed_pages": sum(page not in previous_pages for page in page_hashes)
+    }
+    if reusable and previous.ids == ids:
+        logger.info(f"{index_directory} is up to date with {pdf_path}")
+        previous.close()
+        return stats
+
+    new = [i for i, chunk_id in enumerate(ids) if chunk_id not in previous_rows]
+    new_vectors = np.asarray(embed_documents([texts[i] for i in new]), dtype=np.float32) if new else None
+    dimension = new_vectors.shape[1] if new_vectors is not None else previous.vectors.shape[1] if previous_rows else 0
+    vectors = np.zeros((len(ids), dimension), dtype=np.float32)
+    for i, chunk_id in enumerate(ids):
+        if chunk_id in previous_rows:
+            vectors[i] = previous.vectors[previous_rows[chunk_id]]
+    if new:
+        vectors[new] = new_vectors
+    if previous is not None:
+        previous.close()
+
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{content_hash(''.join(ids))[:8]}"
+    write_index(version_directory(index_directory, version), ids, texts, vectors, Config.EMBEDDING_MODEL, dtype,
+                extra_meta={"version": version, "source": os.path.basename(pdf_path), "page_hashes": page_hashes,
+                            "chunking": [Config.CHUNK_SIZE, Config.CHUNK_OVERLAP]})
+    publish_version(index_directory, version, keep)
+    logger.info(f"Published {index_directory} version {version}")
+    return stats
+
+
+def main():
+    # Imported here so rag_service can use ingest() without a circular import
+    from rag_service import corpora, get_embedding_function
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", action="append", help="corpus to ingest, may be repeated (default: all)")
+    parser.add_argument("--pdf", help="PDF to ingest instead of the corpus pdf_path, only with a single --corpus")
+    parser.add_argument("--dtype", default=Config.INDEX_DTYPE, choices=["float16", "float32"])
+    parser.add_argument("--keep", type=int, default=2, help="versions to keep, including the new one")
+    parser.add_argument("--force", action="store_true", help="re-embed every chunk")
+    args = parser.parse_args()
+    names = args.corpus or list(corpora)
+    if args.pdf and len(names) != 1:
+        parser.error("--pdf needs exactly one --corpus")
+
+    for name in names:
+        corpus = corpora[name]
+        stats = ingest(args.pdf or corpus.pdf_path, corpus.index_directory, get_embedding_function().embed_documents,
+                       args.dtype, max(args.keep, 1), args.force)
+        logger.info(f"{name}: {stats['kept']} chunks kept, {stats['embedded']} embedded, {stats['removed']} removed, "
+                    f"{stats['changed_pages']} changed pages")
+        if corpus.backend != "mmap":
+            logger.info(f"{name} is served from Chroma, set \"backend\": \"mmap\" in corpora.json to serve this index")
+
+
+if __name__ == "__main__":
+    main()
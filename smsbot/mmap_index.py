@@ -0,0 +1,150 @@
+import json
+import mmap
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+VECTORS_FILE = "vectors.npy"
+OFFSETS_FILE = "offsets.npy"
+CHUNKS_FILE = "chunks.bin"
+META_FILE = "meta.json"
+# Versioned layout written by ingestion: <index dir>/CURRENT names the live <index dir>/versions/<version>
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+SEARCH_BLOCK_ROWS = 16384
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def current_version(directory: str) -> Optional[str]:
+    """Name of the live version of a versioned index, None for a flat index directory."""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_index_directory(directory: str) -> str:
+    """The directory holding the live index files, following CURRENT if present."""
+    version = current_version(directory)
+    return os.path.join(directory, VERSIONS_DIR, version) if version else directory
+
+
+def version_directory(directory: str, version: str) -> str:
+    return os.path.join(directory, VERSIONS_DIR, version)
+
+
+def publish_version(directory: str, version: str, keep: int = 2) -> None:
+    """
+    Atomically points CURRENT at a fully written version and removes all but the
+    newest keep versions. Readers still holding an older version keep working
+    until they reload, so keep should be at least 2.
+    """
+    path = os.path.join(directory, CURRENT_FILE)
+    with open(path + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(path + ".tmp", path)
+
+    versions_root = os.path.join(directory, VERSIONS_DIR)
+    versions = sorted(os.listdir(versions_root), key=lambda v: os.path.getmtime(os.path.join(versions_root, v)))
+    for old in versions[:-keep] if keep > 0 else []:
+        if old != version:
+            shutil.rmtree(os.path.join(versions_root, old), ignore_errors=True)
+
+
+def write_index(directory: str, ids: Sequence[str], texts: Sequence[str], vectors: np.ndarray,
+                embedding_model: str, dtype: str = "float16", extra_meta: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Writes chunk vectors and texts in the layout MmapIndex reads.
+
+    vectors.npy holds the normalized vectors as one matrix, chunks.bin the UTF-8
+    chunk texts back to back and offsets.npy the byte offset of every chunk, so
+    chunk i is chunks.bin[offsets[i]:offsets[i + 1]]. Every file is written to a
+    temporary name and swapped in with os.replace.
+    """
+    os.makedirs(directory, exist_ok=True)
+    matrix = normalize_rows(vectors).astype(dtype)
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(chunk) for chunk in encoded])
+    meta = {
+        "embedding_model": embedding_model,
+        "dimension": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "count": len(encoded),
+        "dtype": dtype,
+        "ids": list(ids),
+        **(extra_meta or {})
+    }
+
+    def replace(name, write):
+        path = os.path.join(directory, name)
+        with open(path + ".tmp", "wb") as f:
+            write(f)
+        os.replace(path + ".tmp", path)
+
+    replace(VECTORS_FILE, lambda f: np.save(f, matrix))
+    replace(OFFSETS_FILE, lambda f: np.save(f, offsets))
+    replace(CHUNKS_FILE, lambda f: f.write(b"".join(encoded)))
+    # Metadata last, a reader that sees it sees the files it describes
+    replace(META_FILE, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+
+class MmapIndex:
+    """
+    Read-only chunk index backed by memory-mapped files.
+
+    Opening is a constant-time mmap regardless of corpus size, and worker
+    processes on the same host share the page cache. Top-k search is one
+    matrix-vector product over the normalized vectors (cosine similarity).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        directory = resolve_index_directory(directory)
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.ids: List[str] = self.meta["ids"]
+        self.vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="r")
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode="r")
+        self._chunks_file = open(os.path.join(directory, CHUNKS_FILE), "rb")
+        size = os.fstat(self._chunks_file.fileno()).st_size
+        self._chunks = mmap.mmap(self._chunks_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return os.path.exists(os.path.join(resolve_index_directory(directory), META_FILE))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def text(self, i: int) -> str:
+        return self._chunks[int(self.offsets[i]):int(self.offsets[i + 1])].decode("utf-8")
+
+    def search(self, query_vector: np.ndarray, k: int) -> List[Tuple[str, str, float]]:
+        """Returns (id, text, score) of the k most similar chunks, best first."""
+        if not len(self.ids):
+            return []
+        query = normalize_rows(query_vector)
+        if self.vectors.dtype == np.float32:
+            scores = self.vectors @ query
+        else:
+            # NumPy has no fast float16 matmul, upcast in blocks so the float32 copy stays small
+            scores = np.concatenate([
+                self.vectors[start:start + SEARCH_BLOCK_ROWS].astype(np.float32) @ query
+                for start in range(0, len(self.vectors), SEARCH_BLOCK_ROWS)
+            ])
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], self.text(i), float(scores[i])) for i in top]
+
+    def close(self) -> None:
+        if isinstance(self._chunks, mmap.mmap):
+            self._chunks.close()
+        self._chunks_file.close()
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from groq import AsyncGroq
+from langchain.vectorstores import Chroma
+from langchain.embeddings import SentenceTransformerEmbeddings
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.document_loaders import PyPDFLoader
+from cache import AnswerCache, LRUCache, cache_key, normalize_query
+from config import Config
+from ingest import ingest
+from mmap_index import MmapIndex, current_version
+
+logger = logging.getLogger(__name__)
+
+RAG_PROMPT = """You are a helpful assistant, below is a query from a user and
+    some relevant contexts. Answer the question given the information in those
+    contexts. If you cannot find the answer to the question, say "I don't know".
+    There are sentences saying refer the following screen, please don't say any reference to images or screen.
+    Avoid "Refer to the following screen" text in the message.
+    If the response can be explained in details then explain it.
+    {instructions}
+    Contexts:
+    {context_str}
+    Query: {query}
+    Answer: """
+
+groq_client = AsyncGroq(api_key=Config.GROQ_API_KEY)
+
+# Similarity search is blocking (encoder + Chroma), it runs here instead of on the event loop
+retrieval_executor = ThreadPoolExecutor(max_workers=Config.RETRIEVAL_THREADS, thread_name_prefix="retrieval")
+
+_embedding_function = None
+_embedding_lock = threading.Lock()
+
+# (corpus, index version, normalized query) -> retrieved (chunk id, text) pairs, skips embedding and search
+retrieval_cache = LRUCache(Config.QUERY_CACHE_SIZE)
+# (corpus, normalized query, chunk ids, prompt version) -> answer
+answer_cache = AnswerCache(Config.ANSWER_CACHE_SIZE, Config.ANSWER_CACHE_TTL_SECONDS, Config.ANSWER_CACHE_PATH or None)
+
+
+class UnknownCorpusError(KeyError):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.name = name
+
+
+class CorpusUnavailableError(RuntimeError):
+    """The corpus is configured but its index could not be built or loaded, e.g. the PDF is missing."""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"{name}: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+# Loaded Chroma stores and mmap indexes by (backend, directory), corpora over the same PDF share one
+_stores: Dict[Tuple[str, str], Any] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(backend: str, directory: str, version: str = None):
+    """
+    Returns the shared store for a directory, opening it on first use. For mmap
+    a version other than the shared index's one opens the newly published index.
+    """
+    key = (backend, directory)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and (version is None or store.meta.get("version", "") == version):
+            return store
+        if backend == "mmap":
+            store = MmapIndex(directory)
+        else:
+            store = Chroma(persist_directory=directory, embedding_function=get_embedding_function())
+        _stores[key] = store
+        return store
+
+
+def get_embedding_function():
+    """The SentenceTransformer model, loaded once and shared by every corpus."""
+    global _embedding_function
+    if _embedding_function is None:
+        with _embedding_lock:
+            if _embedding_function is None:
+                _embedding_function = SentenceTransformerEmbeddings(model_name=Config.EMBEDDING_MODEL)
+    return _embedding_function
+
+
+def load_and_process_pdf(pdf_path):
+    loader = PyPDFLoader(pdf_path)
+    documents = loader.load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=Config.CHUNK_SIZE, chunk_overlap=Config.CHUNK_OVERLAP)
+    return text_splitter.split_documents(documents)
+
+
+class Corpus:
+    """
+    A named PDF with its own index and extra prompt instructions.
+
+    The index is either a Chroma store in persist_directory or, with the "mmap"
+    backend, a memory-mapped vector matrix and chunk file in index_directory.
+    Corpora pointing at the same directory share the loaded index.
+    """
+
+    def __init__(self, name: str, pdf_path: str, persist_directory: str, instructions: str = "",
+                 backend: str = "chroma", index_directory: str = ""):
+        self.name = name
+        self.pdf_path = pdf_path
+        self.persist_directory = persist_directory
+        self.instructions = instructions
+        self.backend = backend
+        self.index_directory = index_directory
+        # Changes whenever the prompt, instructions or generation settings change, invalidating cached answers
+        self.prompt_version = cache_key(
+            RAG_PROMPT, instructions, Config.MODEL, Config.TEMPERATURE, Config.MAX_TOKENS)[:16]
+        self.index_version = ""
+        self._vectorstore = None
+        self._index = None
+        self._lock = threading.Lock()
+        self._checked_version_at = 0.0
+        self.load_error = None
+
+    def build_if_missing(self) -> None:
+        """
+        Creates the index from the PDF if it doesn't exist yet.
+        Called once in the parent process so the workers only ever load it.
+        """
+        if self.backend == "mmap":
+            if MmapIndex.exists(self.index_directory):
+                return
+            logger.info(f"Building {self.name} mmap index from {self.pdf_path}")
+            ingest(self.pdf_path, self.index_directory, get_embedding_function().embed_documents)
+            return
+        if os.path.exists(self.persist_directory) and os.listdir(self.persist_directory):
+            return
+        logger.info(f"Building {self.name} vectorstore from {self.pdf_path}")
+        texts = load_and_process_pdf(self.pdf_path)
+        vectorstore = Chroma.from_documents(
+            documents=texts, embedding=get_embedding_function(), persist_directory=self.persist_directory)
+        vectorstore.persist()
+
+    def load(self) -> None:
+        """Builds and opens the index once. Raises CorpusUnavailableError if that failed, now or before."""
+        if self.load_error is not None:
+            raise CorpusUnavailableError(self.name, self.load_error)
+        if self._vectorstore is None and self._index is None:
+            with self._lock:
+                if self.load_error is not None:
+                    raise CorpusUnavailableError(self.name, self.load_error)
+                if self._vectorstore is None and self._index is None:
+                    try:
+                        self._open()
+                    except Exception as e:
+                        logger.error(f"Could not load the {self.name} corpus: {str(e)}", exc_info=True)
+                        self.load_error = str(e)
+                        raise CorpusUnavailableError(self.name, self.load_error) from e
+
+    def _open(self) -> None:
+        self.build_if_missing()
+        if self.backend == "mmap":
+            self._index = open_store("mmap", self.index_directory)
+            self.index_version = self._index.meta.get("version", "")
+            count = len(self._index)
+        else:
+            self._vectorstore = open_store("chroma", self.persist_directory)
+            count = self._vectorstore._collection.count()
+        logger.info(f"Number of documents in {self.name} {self.backend} index: {count}")
+
+    def reload_if_published(self) -> None:
+        """
+        Switches to a version published by ingest.py since the index was loaded.
+        CURRENT is read at most every INDEX_RELOAD_SECONDS. The old index isn't
+        closed, searches still running on it finish and it is freed with them.
+        """
+        now = time.monotonic()
+        if self._index is None or now - self._checked_version_at < Config.INDEX_RELOAD_SECONDS:
+            return
+        self._checked_version_at = now
+        version = current_version(self.index_directory)
+        if version is None or version == self.index_version:
+            return
+        with self._lock:
+            if version != self.index_version:
+                index = open_store("mmap", self.index_directory, version)
+                self._index, self.index_version = index, index.meta.get("version", "")
+                logger.info(f"Reloaded {self.name} index version {self.index_version}, {len(index)} documents")
+
+    def similarity_search(self, query: str) -> List[Tuple[str, str]]:
+        """Returns (chunk id, text) of the TOP_K most similar chunks."""
+        self.load()
+        index = self._index
+        if index is not None:
+            query_vector = get_embedding_function().embed_query(query)
+            return [(chunk_id, text) for chunk_id, text, _ in index.search(query_vector, Config.TOP_K)]
+        results = self._vectorstore.similarity_search(query, k=Config.TOP_K)
+        return [(cache_key(result.page_content)[:16], result.page_content) for result in results]
+
+
+def load_corpora(path: str) -> Dict[str, Corpus]:
+    """
+    Reads the corpus definitions. A corpus with "shares_index_with" uses the
+    other corpus' directories by default, so the same PDF is indexed once.
+    """
+    with open(path) as f:
+        definitions = json.load(f)
+    return {
+        name: Corpus(
+            name,
+            definition["pdf_path"],
+            definition.get("persist_directory", os.path.join(
+                Config.PERSIST_DIRECTORY, definition.get("shares_index_with", name))),
+            definition.get("instructions", ""),
+            definition.get("backend", Config.RETRIEVAL_BACKEND),
+            definition.get("index_directory", os.path.join(
+                Config.INDEX_DIRECTORY, definition.get("shares_index_with", name)))
+        )
+        for name, definition in definitions.items()
+    }
+
+
+corpora = load_corpora(Config.CORPORA_PATH)
+
+
+def get_corpus(name: str) -> Corpus:
+    corpus = corpora.get(name or Config.DEFAULT_CORPUS)
+    if corpus is None:
+        raise UnknownCorpusError(name)
+    return corpus
+
+
+def load_all() -> None:
+    """Loads every corpus, one that fails is logged and answered with 503 instead of stopping the service."""
+    for corpus in corpora.values():
+        try:
+            corpus.load()
+        except CorpusUnavailableError as e:
+            logger.warning(f"Skipping unavailable corpus {e}")
+
+
+def build_all_if_missing() -> None:
+    for corpus in corpora.values():
+        try:
+            corpus.build_if_missing()
+        except Exception as e:
+            # The workers mark the corpus unavailable when they fail to load it
+            logger.error(f"Could not build the {corpus.name} corpus, skipping it: {str(e)}", exc_info=True)
+
+
+async def retrieve(query: str, corpus: Corpus) -> List[Tuple[str, str]]:
+    logger.debug(f"Retrieving relevant contexts from {corpus.name}")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(retrieval_executor, corpus.similarity_search, query)
+
+
+async def rag(query: str, contexts: List[str], corpus: Corpus) -> str:
+    prompt = RAG_PROMPT.format(instructions=corpus.instructions, context_str="\n".join(contexts), query=query)
+    completion = await groq_client.chat.completions.create(
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": prompt}
+        ],
+        model=Config.MODEL,
+        temperature=Config.TEMPERATURE,
+        max_tokens=Config.MAX_TOKENS
+    )
+    return completion.choices[0].message.content
+
+
+async def execute(prompt: str, corpus_name: str = None) -> str:
+    corpus = get_corpus(corpus_name)
+    # Before the cache lookup, a new index version must not be answered from chunks of the old one
+    corpus.reload_if_published()
+    query = normalize_query(prompt)
+
+    retrieval_key = cache_key(corpus.name, corpus.index_version, query)
+    chunks = retrieval_cache.get(retrieval_key)
+    if chunks is None:
+        chunks = await retrieve(prompt, corpus)
+        retrieval_cache.set(retrieval_key, chunks)
+    else:
+        logger.info(f"Retrieved contexts for {corpus.name} from cache")
+
+    answer_key = cache_key(corpus.name, query, *[chunk_id for chunk_id, _ in chunks], corpus.prompt_version)
+    # May fall through to the sqlite file, keep it off the event loop
+    answer = await asyncio.to_thread(answer_cache.get, answer_key)
+    if answer is not None:
+        logger.info(f"Answer for {corpus.name} from cache")
+        return answer
+    answer = await rag(prompt, [text for _, text in chunks], corpus)
+    await asyncio.to_thread(answer_cache.set, answer_key, answer)
+    return answer
+
+
+def cache_stats() -> Dict[str, Dict]:
+    return {"retrieval": retrieval_cache.stats(), "answers": answer_cache.stats()}
+
+
+async def aclose() -> None:
+    await groq_client.close()
+    retrieval_executor.shutdown(wait=False)
+    answer_cache.close()
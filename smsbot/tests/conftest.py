@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the smsbot modules the way the app does, from inside smsbot/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,51 @@
+import os
+import numpy as np
+from mmap_index import MmapIndex, current_version, publish_version, version_directory, write_index
+
+
+def write_version(directory, version, text, age):
+    path = version_directory(directory, version)
+    write_index(path, [version], [text], np.array([[1.0, 0.0]]), "model", extra_meta={"version": version})
+    # publish_version orders versions by modification time
+    os.utime(path, (age, age))
+
+
+def test_flat_directory_has_no_current_version(tmp_path):
+    write_index(str(tmp_path), ["a"], ["flat"], np.array([[1.0, 0.0]]), "model")
+    assert current_version(str(tmp_path)) is None
+    index = MmapIndex(str(tmp_path))
+    assert index.text(0) == "flat"
+    index.close()
+
+
+def test_publish_switches_the_live_version(tmp_path):
+    directory = str(tmp_path)
+    write_version(directory, "v1", "old", 1_000)
+    publish_version(directory, "v1")
+    write_version(directory, "v2", "new", 2_000)
+    assert MmapIndex(directory).text(0) == "old"
+
+    publish_version(directory, "v2")
+    assert current_version(directory) == "v2"
+    index = MmapIndex(directory)
+    assert index.meta["version"] == "v2"
+    assert index.text(0) == "new"
+    index.close()
+    assert not os.path.exists(os.path.join(directory, "CURRENT.tmp"))
+
+
+def test_publish_keeps_only_the_newest_versions(tmp_path):
+    directory = str(tmp_path)
+    for age, version in enumerate(["v1", "v2", "v3"], start=1):
+        write_version(directory, version, version, age * 1_000)
+        publish_version(directory, version, keep=2)
+    assert sorted(os.listdir(os.path.join(directory, "versions"))) == ["v2", "v3"]
+
+
+def test_published_version_is_never_removed(tmp_path):
+    directory = str(tmp_path)
+    write_version(directory, "v1", "old", 2_000)
+    write_version(directory, "v2", "new", 1_000)
+    publish_version(directory, "v2", keep=1)
+    assert "v2" in os.listdir(os.path.join(directory, "versions"))
+    assert MmapIndex(directory).text(0) == "new"
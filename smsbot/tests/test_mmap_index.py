@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from mmap_index import MmapIndex, write_index
+
+IDS = ["a", "b", "c"]
+TEXTS = ["first chunk", "zweiter Abschnitt – ü", ""]
+VECTORS = np.array([[1.0, 0.0], [0.6, 0.8], [0.0, 2.0]])
+
+
+@pytest.mark.parametrize("dtype", ["float16", "float32"])
+def test_written_index_is_read_back(tmp_path, dtype):
+    write_index(str(tmp_path), IDS, TEXTS, VECTORS, "model", dtype)
+    index = MmapIndex(str(tmp_path))
+    try:
+        assert len(index) == 3
+        assert index.meta["embedding_model"] == "model"
+        assert index.vectors.dtype == np.dtype(dtype)
+        assert [index.text(i) for i in range(3)] == TEXTS
+    finally:
+        index.close()
+
+
+@pytest.mark.parametrize("dtype", ["float16", "float32"])
+def test_search_returns_the_most_similar_chunks_first(tmp_path, dtype):
+    write_index(str(tmp_path), IDS, TEXTS, VECTORS, "model", dtype)
+    index = MmapIndex(str(tmp_path))
+    try:
+        results = index.search(np.array([0.0, 5.0]), k=2)
+        assert [chunk_id for chunk_id, _, _ in results] == ["c", "b"]
+        assert results[0][2] == pytest.approx(1.0, abs=1e-3)
+        assert results[1][2] == pytest.approx(0.8, abs=1e-3)
+        assert len(index.search(np.array([1.0, 0.0]), k=10)) == 3
+    finally:
+        index.close()
+
+
+def test_empty_index_returns_no_results(tmp_path):
+    write_index(str(tmp_path), [], [], np.zeros((0, 2)), "model")
+    index = MmapIndex(str(tmp_path))
+    try:
+        assert len(index) == 0
+        assert index.search(np.array([1.0, 0.0]), k=3) == []
+    finally:
+        index.close()
+
+
+def test_exists_needs_the_metadata_file(tmp_path):
+    assert not MmapIndex.exists(str(tmp_path))
+    write_index(str(tmp_path), IDS, TEXTS, VECTORS, "model")
+    assert MmapIndex.exists(str(tmp_path))
@@ -1,14 +1,42 @@
+import asyncio
 from fastapi import FastAPI
 from controllers.conversation_controller import router as conversation_router
 from controllers.missing_info_controller import router as missing_info_router
 from controllers.greeting_controller import router as greeting_router
+from controllers.health_controller import router as health_router, run_warm_up
+from services.ai_client_service import save_response_caches, embedding_service
+from services.client_registry_service import ClientRegistry
+from services.image_worker_pool_service import image_worker_pool
+from services.notification_service import notification_dispatcher
+from upc.config import Config
 
 app = FastAPI()
 
+
+@app.on_event("startup")
+async def start_warm_up():
+    if Config.WARM_UP_ON_STARTUP:
+        # Runs in the background so the process starts serving /ready right away
+        app.state.warm_up_task = asyncio.create_task(run_warm_up())
+
+
+@app.on_event("shutdown")
+def persist_caches():
+    save_response_caches()
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    await ClientRegistry().aclose()
+    await notification_dispatcher.aclose()
+    image_worker_pool.shutdown()
+    embedding_service.shutdown()
+
 # Include routers
 app.include_router(conversation_router)
 app.include_router(missing_info_router)
 app.include_router(greeting_router)
+app.include_router(health_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -15,6 +15,8 @@ class Config:
     # FastAPI settings
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("API_PORT", "8002"))
+    # Load the encoder, caches and provider clients in the background at startup, /ready reports completion
+    WARM_UP_ON_STARTUP: bool = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
 
     # Selected model for general use
     # SELECTED_MODEL: ModelType = ModelType(os.getenv("SELECTED_MODEL", ModelType.GROQ.value))
@@ -28,6 +30,21 @@ class Config:
     GENERAL_CONVERSATION_SELECTED_MODEL_GROQ = os.getenv("GENERAL_CONVERSATION_SELECTED_MODEL_GROQ","llama3-70b-8192")
     GENERAL_CONVERSATION_CACHE_THRESHOLD = 1
 
+    # Semantic response cache (greeting, general and final message namespaces)
+    SEMANTIC_CACHE_DIR = os.getenv("SEMANTIC_CACHE_DIR", "cache/semantic")
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+    SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    SEMANTIC_CACHE_ANN_THRESHOLD = int(os.getenv("SEMANTIC_CACHE_ANN_THRESHOLD", "2000"))  # switch to IVF above this size
+    SEMANTIC_CACHE_NLIST = int(os.getenv("SEMANTIC_CACHE_NLIST", "64"))
+    SEMANTIC_CACHE_NPROBE = int(os.getenv("SEMANTIC_CACHE_NPROBE", "8"))
+    SEMANTIC_CACHE_PERSIST_EVERY = int(os.getenv("SEMANTIC_CACHE_PERSIST_EVERY", "20"))  # writes between saves
+
+    # Embedding service: concurrent encode requests are micro-batched on a dedicated thread pool
+    EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+    EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+    EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "1"))
+    EMBEDDING_QUANTIZATION = os.getenv("EMBEDDING_QUANTIZATION", "none")  # "none", "fp16" or "int8"
+
     PLAN_EXTRACTOR_SELECTED_MODEL_CLIENT = os.getenv("PLAN_EXTRACTOR_SELECTED_MODEL_CLIENT", "groq")
     PLAN_EXTRACTOR_SELECTED_MODEL_GROQ = os.getenv("PLAN_EXTRACTOR_SELECTED_MODEL_GROQ", "llama3-70b-8192")
     PLAN_EXTRACTOR_SELECTED_MODEL_OPENAI = os.getenv("PLAN_EXTRACTOR_SELECTED_MODEL_OPENAI", "gpt-4o")
@@ -41,11 +58,80 @@ class Config:
     MODEL_FINAL_MSG_MODEL_OPENAI = os.getenv("MODEL_FINAL_MSG_MODEL_OPENAI", "gpt-4o")
 
 
+    # Confirmation checks for product turns: "sequential" runs check_confirmation and then
+    # check_change_confirmation after plan extraction, "parallel" fires all three at once
+    # (lower latency, but the change check is always paid for)
+    CONFIRMATION_CHECK_MODE = os.getenv("CONFIRMATION_CHECK_MODE", "sequential")
+
+    # Intent routing: "legacy" runs the classifier, confirmation, change confirmation and field
+    # extraction calls separately, "combined" answers all four with a single structured call
+    INTENT_ROUTER_MODE = os.getenv("INTENT_ROUTER_MODE", "legacy")
+    INTENT_ROUTER_SELECTED_MODEL_CLIENT = os.getenv("INTENT_ROUTER_SELECTED_MODEL_CLIENT", "groq")
+    INTENT_ROUTER_SELECTED_MODEL_GROQ = os.getenv("INTENT_ROUTER_SELECTED_MODEL_GROQ", "llama-3.3-70b-versatile")
+    INTENT_ROUTER_SELECTED_MODEL_OPENAI = os.getenv("INTENT_ROUTER_SELECTED_MODEL_OPENAI", "gpt-4o")
+
+    # Plan extraction prompt: "full" re-reads the conversation window against the whole schema,
+    # "delta" sends only the stored plan and the latest user message and merges a field patch
+    PLAN_EXTRACTION_MODE = os.getenv("PLAN_EXTRACTION_MODE", "full")
+
+    # Per-conversation state (last extracted plan), "memory" or "redis"
+    STATE_STORE_BACKEND = os.getenv("STATE_STORE_BACKEND", "memory")
+    STATE_STORE_TTL_SECONDS = int(os.getenv("STATE_STORE_TTL_SECONDS", "1800"))
+    STATE_STORE_MAX_ENTRIES = int(os.getenv("STATE_STORE_MAX_ENTRIES", "10000"))
+    STATE_STORE_MAX_BYTES = int(os.getenv("STATE_STORE_MAX_BYTES", str(50 * 1024 * 1024)))
+    STATE_STORE_REDIS_URL = os.getenv("STATE_STORE_REDIS_URL", "redis://localhost:6379/0")
+
+
     MODEL_IMAGE_CLIENT = os.getenv("MODEL_IMAGE_CLIENT", "groq")
     MODEL_IMAGE_GROQ = os.getenv("MODEL_IMAGE_GROQ", "llama3-70b-8192")
     MODEL_IMAGE_OPENAI = os.getenv("MODEL_IMAGE_OPENAI", "gpt-4o")
 
 
+    # Image processing notifications sent back to the Botpress side
+    NOTIFICATION_URL = os.getenv("NOTIFICATION_URL", "http://10.0.13.74:8099/BPE/api/v1/message/notification")
+    NOTIFICATION_INTERVAL_SECONDS = float(os.getenv("NOTIFICATION_INTERVAL_SECONDS", "2"))
+    NOTIFICATION_TIMEOUT_SECONDS = float(os.getenv("NOTIFICATION_TIMEOUT_SECONDS", "2"))
+    NOTIFICATION_MAX_CONNECTIONS = int(os.getenv("NOTIFICATION_MAX_CONNECTIONS", "20"))
+
+    # Image pre-processing before the vision call
+    IMAGE_MAX_LONG_SIDE = int(os.getenv("IMAGE_MAX_LONG_SIDE", "2048"))
+    IMAGE_MAX_SHORT_SIDE = int(os.getenv("IMAGE_MAX_SHORT_SIDE", "768"))
+    IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+    IMAGE_MAX_PNG_BYTES = int(os.getenv("IMAGE_MAX_PNG_BYTES", str(1024 * 1024)))
+
+    # Bounded concurrency for image turns, requests beyond the queue get a 429
+    IMAGE_MAX_CONCURRENCY = int(os.getenv("IMAGE_MAX_CONCURRENCY", "4"))
+    IMAGE_QUEUE_DEPTH = int(os.getenv("IMAGE_QUEUE_DEPTH", "8"))
+    IMAGE_BUSY_RETRY_AFTER_SECONDS = int(os.getenv("IMAGE_BUSY_RETRY_AFTER_SECONDS", "5"))
+
+    # Persistent cache of image extraction results
+    IMAGE_RESULT_CACHE_PATH = os.getenv("IMAGE_RESULT_CACHE_PATH", "cache/image_results.sqlite3")
+    IMAGE_RESULT_CACHE_SIZE = int(os.getenv("IMAGE_RESULT_CACHE_SIZE", "5000"))
+
+    # Local rule/embedding fast path for the confirmation and change checks
+    INTENT_MATCHER_ENABLED = os.getenv("INTENT_MATCHER_ENABLED", "true").lower() == "true"
+    INTENT_MATCHER_RULES_PATH = os.getenv(
+        "INTENT_MATCHER_RULES_PATH", os.path.join(os.path.dirname(__file__), "data", "intent_rules.json"))
+    INTENT_MATCHER_USE_EMBEDDINGS = os.getenv("INTENT_MATCHER_USE_EMBEDDINGS", "false").lower() == "true"
+
+    # Local nearest-centroid product/general classifier in front of the LLM classifier
+    LOCAL_CLASSIFIER_ENABLED = os.getenv("LOCAL_CLASSIFIER_ENABLED", "true").lower() == "true"
+    LOCAL_CLASSIFIER_EXAMPLES_PATH = os.getenv(
+        "LOCAL_CLASSIFIER_EXAMPLES_PATH", os.path.join(os.path.dirname(__file__), "data", "classifier_examples.jsonl"))
+    LOCAL_CLASSIFIER_MIN_SIMILARITY = float(os.getenv("LOCAL_CLASSIFIER_MIN_SIMILARITY", "0.45"))
+    LOCAL_CLASSIFIER_MARGIN = float(os.getenv("LOCAL_CLASSIFIER_MARGIN", "0.1"))
+
+    # Conversation history windows, budgets are in tokens
+    HISTORY_TOKENIZER_ENCODING = os.getenv("HISTORY_TOKENIZER_ENCODING", "cl100k_base")
+    HISTORY_CLASSIFIER_TOKEN_BUDGET = int(os.getenv("HISTORY_CLASSIFIER_TOKEN_BUDGET", "2000"))
+    HISTORY_EXTRACTION_TOKEN_BUDGET = int(os.getenv("HISTORY_EXTRACTION_TOKEN_BUDGET", "1500"))
+    HISTORY_EXTRACTION_MAX_MESSAGES = int(os.getenv("HISTORY_EXTRACTION_MAX_MESSAGES", "6"))
+    HISTORY_CONFIRMATION_TOKEN_BUDGET = int(os.getenv("HISTORY_CONFIRMATION_TOKEN_BUDGET", "600"))
+    HISTORY_CONFIRMATION_MAX_MESSAGES = int(os.getenv("HISTORY_CONFIRMATION_MAX_MESSAGES", "3"))
+    HISTORY_MISSING_INFO_TOKEN_BUDGET = int(os.getenv("HISTORY_MISSING_INFO_TOKEN_BUDGET", "2000"))
+    HISTORY_CACHE_MAX_CONVERSATIONS = int(os.getenv("HISTORY_CACHE_MAX_CONVERSATIONS", "10000"))
+    HISTORY_SERIALIZED_PER_CONVERSATION = int(os.getenv("HISTORY_SERIALIZED_PER_CONVERSATION", "8"))
+
     # Image processing model
     IMAGE_PROCESSING_MODEL: ModelType = ModelType.OPENAI
 
@@ -53,6 +139,15 @@ class Config:
     DEFAULT_GENERAL_RESPONSE = "hi would you like to create any  product"
     DEFAULT_FINAL_RESPONSE = "somthing happened please try later"
 
+    # Pooled HTTP clients shared by all provider SDK clients
+    LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    LLM_HTTP_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "60"))
+    LLM_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+    # Providers to talk to over HTTP/2 (needs the h2 package), comma separated
+    LLM_HTTP2_PROVIDERS = [p.strip() for p in os.getenv("LLM_HTTP2_PROVIDERS", "openai").split(",") if p.strip()]
+
     # API keys
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
@@ -115,6 +210,27 @@ class FunctionConfig:
             "expected_duration": 5.5
         },
 
+        "extract_plan_async": {
+            "name": "extract_plan_async",
+            "description": "Extracts product plan details without blocking the event loop",
+            "track_metrics": True,
+            "expected_duration": 10.0
+        },
+
+        "extract_plan_delta_async": {
+            "name": "extract_plan_delta_async",
+            "description": "Patches a stored product plan from the latest message",
+            "track_metrics": True,
+            "expected_duration": 4.0
+        },
+
+        "make_api_call_general_async": {
+            "name": "make_api_call_general_async",
+            "description": "Makes general API calls without blocking the event loop",
+            "track_metrics": True,
+            "expected_duration": 5.5
+        },
+
     }
 
     # Metric logging configuration
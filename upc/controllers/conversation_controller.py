@@ -1,39 +1,56 @@
 from fastapi import APIRouter, HTTPException, FastAPI
 from markdown_it.rules_inline import image
-import threading
+import asyncio
 import  time
-from services.notification_service import  notify_image_processing
+from services.notification_service import notification_dispatcher
 from models.conversation_models import ConversationRequest
 from models.response_models import PlanResponse
-from services.conversation_service import handle_conversation, handle_conversation_general
-from services.plan_extractor_service import extract_plan, check_confirmation, form_final_message, check_change_confirmation,extract_field
+from services.conversation_service import handle_conversation, handle_conversation_general_async, clear_conversation_state
+from services.plan_extractor_service import check_confirmation_async, form_final_message_async, check_change_confirmation_async, extract_field_async
 from services.image_processor_service import ImageProcessor
-from utils.helpers import is_product_related
-import requests
+from services.image_worker_pool_service import image_worker_pool
+from utils.conversation_context import ConversationContext, summarize_request
+from services.intent_router_service import route_intent_async
+from utils.helpers import is_product_related_async
+from utils.streaming import stream_plan_response
+from services.ai_client_service import TokenCallback
 import json
 from datetime import datetime
+from upc.config import Config
 from upc.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 router = APIRouter()
-def periodic_notifications(conversationId, stop_event):
-    messages = [
-        "Processing your image...",
-        "This might take a few more seconds...",
-        "Almost there! Thanks for your patience.",
-        "Just a bit longer...",
-        "Finalizing the image processing..."
-    ]
-    message_index = 0
-    while not stop_event.is_set():
-        notify_image_processing(conversationId, messages[message_index])
-        message_index = (message_index + 1) % len(messages)
-        time.sleep(2)  # Wait for 2 seconds before sending the next notification
-        
 
 @router.post("/conversation", response_model=PlanResponse)
-async def conversation_endpoint(request: ConversationRequest):
+async def conversation_endpoint(request: ConversationRequest, stream: bool = False):
+    if stream:
+        if request.currentMessage.messageType == "image":
+            # Reject before the stream starts so the client still gets a plain 429
+            image_worker_pool.check_capacity()
+        return stream_plan_response(lambda on_token: run_conversation(request, on_token))
+    return await run_conversation(request)
+
+
+async def run_conversation(request: ConversationRequest, on_token: TokenCallback = None) -> PlanResponse:
+    if request.currentMessage.messageType != "image":
+        return await _run_conversation(request, on_token)
+    # Image turns hold a worker pool slot for the vision call, extraction and final message
+    async with image_worker_pool.slot():
+        return await _run_conversation(request, on_token)
+
+
+async def _speculative(check):
+    """Awaits a speculative check, a failure leaves it None so the sequential path runs it again if needed."""
+    try:
+        return await check
+    except Exception as e:
+        logger.warning(f"Speculative check failed, deferring to the sequential path: {e}")
+        return None
+
+
+async def _run_conversation(request: ConversationRequest, on_token: TokenCallback = None) -> PlanResponse:
     
     conv_start = time.time()
     
@@ -42,70 +59,75 @@ async def conversation_endpoint(request: ConversationRequest):
     try:
         conversationId = request.sender.phoneNumber
         print("Conversation ID:", conversationId)
-        logger.info(f"Incoming message to conversation: {request.model_dump_json()}")
+        logger.info(f"Incoming message to conversation: {summarize_request(request)}")
         # Handle image messages
         if request.currentMessage.messageType == "image":
             image_boolean = True
             image_processing_start = time.time()
             logger.info("Starting image processing")
 
-            # Notify the external service about the image processing
-            notification_url = "http://10.0.13.74:8099/BPE/api/v1/message/notification"
-            notification_params = {
-                "notification": "processing image..",
-                "conversationId": request.sender.phoneNumber
-            }
-            try:
-                response = requests.post(notification_url, params=notification_params)
-                response.raise_for_status()
-                print("Notification sent successfully.")
-            except requests.exceptions.RequestException as e:
-                print(f"Failed to send notification: {e}")
-
             logger.info("Processing image message")
-            stop_event = threading.Event()
-            notification_thread = threading.Thread(target=periodic_notifications, args=(conversationId, stop_event))
-            notification_thread.start()
-
             image_processor = ImageProcessor()
             image_data = request.currentMessage.payload.text
-            extracted_content = image_processor.extract_image_content(image_data)
+            # Notify the external service about the image processing while the vision call runs
+            async with notification_dispatcher.progress(conversationId):
+                extracted_content = await image_processor.extract_image_content_async(image_data)
             logger.debug(f"Extracted content from image: {extracted_content}")
 
-            stop_event.set()
-            notification_thread.join()
-
             # Replace the image payload with the extracted content
             request.currentMessage.payload.text = extracted_content
             request.currentMessage.messageType = "text"
         
         
-        all_messages = request.previousMessages + [request.currentMessage]
-        logger.debug(f"previousMessages------------: {request.previousMessages}")
-        logger.debug(f"all_messages: {all_messages}")
-        formatted_messages = [
-            {
-                "role": "user" if msg.source == "ui" else "assistant",
-                "content": msg.payload.text
-            } for msg in all_messages
-        ]
-        logger.debug(f"Formatted messagesssssssssssss: {formatted_messages}")
+        # Formatted and serialized once, shared by every stage below
+        context = ConversationContext(request)
+        messages = context.history(Config.HISTORY_CLASSIFIER_TOKEN_BUDGET)
+        logger.debug(f"Formatted messages: {len(context.messages)} messages, {len(messages)} chars")
 
-        messages = json.dumps(formatted_messages, indent=2)
-        logger.debug(f"Formatted messages: {messages}")
+        route = None
+        if Config.INTENT_ROUTER_MODE == "combined":
+            route = await route_intent_async(messages)
 
-        if is_product_related(messages):
+        if route is not None:
+            product_related = route.classification == "product_related"
+        else:
+            product_related = await is_product_related_async(messages)
+
+        if product_related:
             logger.info("Conversation is product-related")
             final = time.time()
             handle_start = time.time()
             logger.info("Starting to handle conversation")
-            extracted_plan = await handle_conversation(request)
+            messages_filtered = context.history(
+                Config.HISTORY_CONFIRMATION_TOKEN_BUDGET, Config.HISTORY_CONFIRMATION_MAX_MESSAGES)
+            # Results of the speculative checks, None when they still have to run
+            confirmed = None
+            change_requested = None
+            if route is not None:
+                confirmed = route.confirmed
+                change_requested = route.change_requested
+                extracted_plan = await handle_conversation(request, context)
+            elif Config.CONFIRMATION_CHECK_MODE == "parallel" and not image_boolean:
+                logger.info("Running plan extraction and confirmation checks concurrently")
+                checks = [
+                    asyncio.create_task(_speculative(check_confirmation_async(messages_filtered))),
+                    asyncio.create_task(_speculative(check_change_confirmation_async(messages_filtered)))
+                ]
+                try:
+                    extracted_plan = await handle_conversation(request, context)
+                    confirmed, change_requested = await asyncio.gather(*checks)
+                finally:
+                    # No-op for finished checks, stops the others when extraction failed
+                    for task in checks:
+                        task.cancel()
+            else:
+                extracted_plan = await handle_conversation(request, context)
             handle_end = time.time()
             logger.info(f"extracted_plan Handling conversation completed in {handle_end - handle_start:.2f} seconds")
             logger.debug(f"Extracted plan: {extracted_plan}")
 
             if image_boolean:
-                final_message = form_final_message(extracted_plan)
+                final_message = await form_final_message_async(extracted_plan, on_token)
                 logger.info("Sending final confirmation message")
                 image_processing_end = time.time()
                 logger.info(f"Image processing completed in {image_processing_end - image_processing_start:.2f} seconds")
@@ -125,17 +147,16 @@ async def conversation_endpoint(request: ConversationRequest):
 
             logger.debug(f"Final extracted plan: {json.dumps(extracted_plan, indent=2)}")
 
-            filtered_messages = formatted_messages[-3:]
-            print("filtered_messages---------------------",filtered_messages)
-            messages_filtered = json.dumps(filtered_messages, indent=2)
-            print("messages_filtered---------------------",messages_filtered)
-
-            if not check_confirmation(messages_filtered):
+            if confirmed is None:
+                confirmed = await check_confirmation_async(messages_filtered)
+            if not confirmed:
                 logger.info("Confirmation not provided, checking for change confirmation.")
                 change_time = None
-                if not check_change_confirmation(messages_filtered):
+                if change_requested is None:
+                    change_requested = await check_change_confirmation_async(messages_filtered)
+                if not change_requested:
                     change_time = time.time()
-                    final_message = form_final_message(extracted_plan)
+                    final_message = await form_final_message_async(extracted_plan, on_token)
                     final_e = time.time()
                     logger.info(f"extract plan to final message template in {final_e - final:.2f} seconds")
                     logger.info("Sending final message as confirmation and change confirmation are both false.")
@@ -152,7 +173,10 @@ async def conversation_endpoint(request: ConversationRequest):
                 else:
                     change_time = time.time()
                     logger.info("Change confirmation is true. Reordering extracted plan.")
-                    field_to_change = extract_field(messages_filtered)
+                    if route is not None:
+                        field_to_change = route.field_to_change
+                    else:
+                        field_to_change = await extract_field_async(messages_filtered)
                     # Define dummy values for different types of fields
                     dummy_values = {
                         'product_name': 'Unnamed Product',
@@ -188,6 +212,8 @@ async def conversation_endpoint(request: ConversationRequest):
 #                         reordered_plan = extracted_plan
 
                     print("---------------------------------------------------------------------------",reordered_plan)
+                    # The plan is reset for the user to fill in again, don't merge into the old one
+                    await clear_conversation_state(request.conversationId)
                     change_e = time.time()
                     logger.info(f"CHANGE TIME CHECK {change_e - change_time:.2f} seconds")
 
@@ -202,6 +228,7 @@ async def conversation_endpoint(request: ConversationRequest):
                     )
             else:
                 logger.info("Confirmation is true. Sending extracted plan as product response.")
+                await clear_conversation_state(request.conversationId)
                 return PlanResponse(
                     conversationId=request.conversationId,
                     currentMessage={
@@ -216,7 +243,7 @@ async def conversation_endpoint(request: ConversationRequest):
            
             gen_start = time.time()
             logger.info("Handling general conversation")
-            response = handle_conversation_general(messages)
+            response = await handle_conversation_general_async(messages, on_token)
             gen_end = time.time()
             logger.info(f"general Handling conversation completed in {gen_end - gen_start:.2f} seconds")
             logger.debug(f"General conversation response: {response}")
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 from models.conversation_models import GreetingRequest
 from models.response_models import PlanResponse
-from services.conversation_service import handle_greeting
+from services.ai_client_service import TokenCallback
+from services.conversation_service import handle_greeting_async
+from utils.streaming import stream_plan_response
 from upc.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -9,10 +11,16 @@ logger = setup_logger(__name__)
 router = APIRouter()
 
 @router.post("/greeting", response_model=PlanResponse)
-async def greeting(request: GreetingRequest):
+async def greeting(request: GreetingRequest, stream: bool = False):
+    if stream:
+        return stream_plan_response(lambda on_token: run_greeting(request, on_token))
+    return await run_greeting(request)
+
+
+async def run_greeting(request: GreetingRequest, on_token: TokenCallback = None) -> PlanResponse:
     logger.info(f"Received greeting request for user: {request.sender.name}")
     user_name = request.sender.name
-    resp = handle_greeting(user_name)
+    resp = await handle_greeting_async(user_name, on_token)
     logger.debug(f"Greeting response: {resp}")
     return PlanResponse(
         currentMessage={
@@ -21,4 +29,4 @@ async def greeting(request: GreetingRequest):
             "messageType": "text",
             "payload": {"text": resp}
         }
-    )
\ No newline at end of file
+    )
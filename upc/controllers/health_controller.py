@@ -0,0 +1,30 @@
+import asyncio
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from services.ai_client_service import warm_up
+from upc.config import Config
+from upc.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+router = APIRouter()
+
+# Without warm-up everything initializes lazily on first use, so the service is ready immediately
+warm_up_state = {"ready": not Config.WARM_UP_ON_STARTUP, "error": None}
+
+
+async def run_warm_up():
+    try:
+        await asyncio.to_thread(warm_up)
+        warm_up_state["ready"] = True
+    except Exception as e:
+        logger.error(f"Error during warm up: {str(e)}", exc_info=True)
+        warm_up_state["error"] = str(e)
+
+
+@router.get("/ready")
+async def readiness():
+    if warm_up_state["ready"]:
+        return {"status": "ready"}
+    status = "error" if warm_up_state["error"] else "warming_up"
+    return JSONResponse(status_code=503, content={"status": status, "detail": warm_up_state["error"]})
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from models.conversation_models import ConversationRequest
 from models.response_models import PlanResponse
+from services.ai_client_service import TokenCallback
 from services.missing_info_service import MissingInfoAdapter
+from utils.streaming import stream_plan_response
 from datetime import datetime
 from upc.logger import setup_logger
 
@@ -10,11 +12,17 @@ logger = setup_logger(__name__)
 router = APIRouter()
 
 @router.post("/handle_missing_info", response_model=PlanResponse)
-async def handle_missing_info(request: ConversationRequest):
+async def handle_missing_info(request: ConversationRequest, stream: bool = False):
+    if stream:
+        return stream_plan_response(lambda on_token: run_missing_info(request, on_token))
+    return await run_missing_info(request)
+
+
+async def run_missing_info(request: ConversationRequest, on_token: TokenCallback = None) -> PlanResponse:
     logger.info(f"Received missing info request for conversation ID: {request.conversationId}")
     adapter = MissingInfoAdapter()
     try:
-        response = adapter.process_request(request)
+        response = await adapter.process_request_async(request, on_token)
         logger.debug(f"Missing info response: {response}")
         return PlanResponse(
             conversationId=request.conversationId,
@@ -10,4 +10,8 @@ class JSONParseError(HTTPException):
 
 class InvalidModelError(ValueError):
     def __init__(self, model: str):
-        super().__init__(f"Invalid model selected: {model}")
\ No newline at end of file
+        super().__init__(f"Invalid model selected: {model}")
+
+class ServiceBusyError(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(status_code=429, detail="busy", headers={"Retry-After": str(retry_after)})
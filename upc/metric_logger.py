@@ -2,6 +2,7 @@ import logging
 import json
 import time
 import functools
+import asyncio
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 import os
@@ -84,6 +85,27 @@ class MetricLogger:
                 f"Function: {function_name}, Time: {execution_time:.3f}s, Status: {status}"
             )
 
+    def log_event(self,
+                  event_name: str,
+                  request_id: Optional[str] = None,
+                  additional_data: Optional[Dict[str, Any]] = None):
+        """
+        Log a non-timing event such as a cache hit or a routing decision
+        """
+        event_data = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "event": event_name,
+            "request_id": request_id or "unknown",
+        }
+
+        if additional_data:
+            event_data.update(additional_data)
+
+        if FunctionConfig.METRIC_LOG_FORMAT == 'json':
+            self.logger.info(json.dumps(event_data))
+        else:
+            self.logger.info(f"Event: {event_name}, Data: {additional_data}")
+
 
 def track_execution_time(request_id_arg: Optional[str] = None):
     """
@@ -94,20 +116,58 @@ def track_execution_time(request_id_arg: Optional[str] = None):
     """
 
     def decorator(func):
+        def get_request_id(args, kwargs):
+            # Try to get request_id from arguments if specified
+            if request_id_arg:
+                if request_id_arg in kwargs:
+                    return kwargs[request_id_arg]
+                elif args and hasattr(args[0], request_id_arg):
+                    return getattr(args[0], request_id_arg)
+            return None
+
+        def log_execution(start_time, status, request_id):
+            execution_time = time.time() - start_time
+            metric_logger = MetricLogger()
+
+            additional_data = {
+                "module": func.__module__,
+                "function_name": func.__name__
+            }
+
+            metric_logger.log_metric(
+                function_name=func.__name__,
+                execution_time=execution_time,
+                status=status,
+                request_id=request_id,
+                additional_data=additional_data
+            )
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = time.time()
+                status = "success"
+                request_id = get_request_id(args, kwargs)
+
+                try:
+                    return await func(*args, **kwargs)
+
+                except Exception as e:
+                    status = "error"
+                    raise
+
+                finally:
+                    log_execution(start_time, status, request_id)
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             start_time = time.time()
             status = "success"
-            request_id = None
+            request_id = get_request_id(args, kwargs)
 
             try:
-                # Try to get request_id from arguments if specified
-                if request_id_arg:
-                    if request_id_arg in kwargs:
-                        request_id = kwargs[request_id_arg]
-                    elif args and hasattr(args[0], request_id_arg):
-                        request_id = getattr(args[0], request_id_arg)
-
                 result = func(*args, **kwargs)
                 return result
 
@@ -116,21 +176,7 @@ def track_execution_time(request_id_arg: Optional[str] = None):
                 raise
 
             finally:
-                execution_time = time.time() - start_time
-                metric_logger = MetricLogger()
-
-                additional_data = {
-                    "module": func.__module__,
-                    "function_name": func.__name__
-                }
-
-                metric_logger.log_metric(
-                    function_name=func.__name__,
-                    execution_time=execution_time,
-                    status=status,
-                    request_id=request_id,
-                    additional_data=additional_data
-                )
+                log_execution(start_time, status, request_id)
 
         return wrapper
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 
 class ProductMessage(BaseModel):
     product_name: Optional[str] = None
@@ -14,6 +14,10 @@ class ProductMessage(BaseModel):
     data_allowance: Optional[str] = None
     voice_allowance: Optional[str] = None
 
+class ProductPatch(ProductMessage):
+    """Field-level change set for a previously extracted plan, None means unchanged"""
+    cleared_fields: List[str] = Field(default_factory=list, example=["price_mode"])
+
 class ProductSchema(BaseModel):
     price: int = Field(0, example=10)
     validity: int = Field(0, example=30)
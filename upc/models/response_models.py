@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Union, Literal
 from models.product_models import ProductMessage
 
 # schemas.py
@@ -51,4 +51,10 @@ class PlanResponseBack(BaseModel):
     })
 
 class ConformationMessage(BaseModel):
-    value: str =  Field(..., example="true")
\ No newline at end of file
+    value: str =  Field(..., example="true")
+
+class IntentRoute(BaseModel):
+    classification: Literal["product_related", "general_conversation"] = Field(..., example="product_related")
+    confirmed: bool = Field(False, example=False)
+    change_requested: bool = Field(False, example=True)
+    field_to_change: str = Field("", example="price_mode")
@@ -0,0 +1,96 @@
+"""
+Offline evaluation of the local product/general classifier against the LLM classifier.
+
+Trains the nearest-centroid classifier on the examples file, then reports accuracy,
+coverage (share of messages answered locally) and latency on a held-out file for
+the local classifier alone, the LLM classifier alone and the combined pipeline.
+
+Usage (from the upc directory):
+    python scripts/evaluate_local_classifier.py [--eval data/classifier_eval.jsonl] [--skip-llm]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+UPC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [UPC_DIR, os.path.dirname(UPC_DIR)]
+
+import numpy as np  # noqa: E402
+from services.ai_client_service import get_encoder, make_classification_call  # noqa: E402
+from services.local_classifier_service import NearestCentroidClassifier, load_examples  # noqa: E402
+from utils.prompts import PRODUCT_CONVERSATION_CLASSIFIER_PROMPT  # noqa: E402
+from upc.config import Config  # noqa: E402
+
+
+def llm_label(text: str) -> str:
+    message = json.dumps([{"role": "user", "content": text}], separators=(",", ":"), ensure_ascii=False)
+    try:
+        response = make_classification_call(PRODUCT_CONVERSATION_CLASSIFIER_PROMPT.format(message=message))
+        return json.loads(response)["classification"]
+    except Exception as e:
+        print(f"LLM classification failed for {text!r}: {e}", file=sys.stderr)
+        return "product_related"
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return "n/a"
+    ms = np.array(latencies) * 1000
+    return f"p50 {np.percentile(ms, 50):.1f} ms, p95 {np.percentile(ms, 95):.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train", default=Config.LOCAL_CLASSIFIER_EXAMPLES_PATH)
+    parser.add_argument("--eval", default=os.path.join(UPC_DIR, "data", "classifier_eval.jsonl"))
+    parser.add_argument("--min-similarity", type=float, default=Config.LOCAL_CLASSIFIER_MIN_SIMILARITY)
+    parser.add_argument("--margin", type=float, default=Config.LOCAL_CLASSIFIER_MARGIN)
+    parser.add_argument("--skip-llm", action="store_true", help="only evaluate the local classifier")
+    args = parser.parse_args()
+
+    train = load_examples(args.train)
+    evaluation = load_examples(args.eval)
+    get_encoder()  # load the model before timing anything
+
+    classifier = NearestCentroidClassifier(args.min_similarity, args.margin).fit(
+        [e["text"] for e in train], [e["label"] for e in train])
+
+    local_correct = confident = confident_correct = combined_correct = llm_correct = 0
+    local_latencies, llm_latencies, combined_latencies = [], [], []
+    for example in evaluation:
+        start = time.perf_counter()
+        prediction = classifier.predict(get_encoder().encode(example["text"]))
+        local_latency = time.perf_counter() - start
+        local_latencies.append(local_latency)
+        local_correct += prediction.label == example["label"]
+
+        if prediction.confident:
+            confident += 1
+            confident_correct += prediction.label == example["label"]
+
+        if args.skip_llm:
+            continue
+        start = time.perf_counter()
+        label = llm_label(example["text"])
+        llm_latency = time.perf_counter() - start
+        llm_latencies.append(llm_latency)
+        llm_correct += label == example["label"]
+
+        combined_label = prediction.label if prediction.confident else label
+        combined_latencies.append(local_latency + (0 if prediction.confident else llm_latency))
+        combined_correct += combined_label == example["label"]
+
+    total = len(evaluation)
+    print(f"Examples: {len(train)} train, {total} eval")
+    print(f"Local:    accuracy {local_correct / total:.1%}, {latency_summary(local_latencies)}")
+    print(f"          confident on {confident / total:.1%} of messages, "
+          f"accuracy there {confident_correct / max(confident, 1):.1%}")
+    if not args.skip_llm:
+        print(f"LLM:      accuracy {llm_correct / total:.1%}, {latency_summary(llm_latencies)}")
+        print(f"Combined: accuracy {combined_correct / total:.1%}, {latency_summary(combined_latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,104 +1,157 @@
 from upc.config import Config, ModelType
-from upc.exceptions import APICallError
-import groq
-import anthropic
-import instructor
-from typing import Literal
+from upc.exceptions import APICallError, InvalidModelError
+from typing import TYPE_CHECKING, Literal, Optional, Callable, Awaitable, Dict, List
 from pydantic import BaseModel
 from upc.logger import setup_logger
 import os
-import openai
-import faiss
-import numpy as np
 import json
-from sentence_transformers import SentenceTransformer
+import threading
 from upc.metric_logger import track_execution_time
+from services.embedding_service import EmbeddingService
+from services.client_registry_service import ClientRegistry
+if TYPE_CHECKING:
+    # Annotations only, the SDKs are loaded by ClientRegistry when a client is first built
+    import groq
+    import openai
 logger = setup_logger(__name__)
+# Receives streamed content deltas, None means the call is not streamed
+TokenCallback = Optional[Callable[[str], Awaitable[None]]]
 dimension = 768  # Dimension of embeddings
-faiss_index = faiss.IndexFlatIP(dimension)  # FAISS index for similarity search
-embeddings = []  # List to store embeddings
-icd_codes = []  # List to store ICD codes
-client = groq.Groq(api_key=os.getenv("GROQ_API_KEY"))
-groq_client  = groq.Groq(api_key=os.getenv("GROQ_API_KEY"))
-open_ai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-image_client = None
-model = SentenceTransformer("paraphrase-distilroberta-base-v2")
-def initialize_clients():
-    global client, image_client
-    logger.info("Initializing AI clients")
-    if Config.SELECTED_MODEL == ModelType.GROQ:
-        client = groq.Groq(api_key=Config.get_api_key())
-        logger.info("Initialized Groq client")
-    elif Config.SELECTED_MODEL == ModelType.OPENAI:
-        client = openai.OpenAI(api_key=Config.get_api_key())
-        logger.info("Initialized OpenAI client")
-    elif Config.SELECTED_MODEL == ModelType.CLAUDE:
-        client = anthropic.Anthropic(api_key=Config.get_api_key())
-        logger.info("Initialized Claude client")
-    else:
-        logger.error(f"Invalid model selected: {Config.SELECTED_MODEL.value}")
-        raise APICallError(Config.SELECTED_MODEL.value, "Invalid model selected")
 
-    # Always use OpenAI for image processing
-    image_client = instructor.patch(openai.OpenAI(api_key=Config.get_api_key(ModelType.OPENAI)))
-    logger.info("Initialized OpenAI image client")
+# Provider clients, the encoder and the response caches are created on first use
+# (or by warm_up) so importing this module stays cheap
+
+
+def get_groq_client() -> "groq.Groq":
+    return ClientRegistry().get_client("groq")
+
+
+def get_openai_client() -> "openai.OpenAI":
+    return ClientRegistry().get_client("openai")
+
+
+def get_async_groq_client() -> "groq.AsyncGroq":
+    return ClientRegistry().get_client("groq", use_async=True)
+
 
+def get_async_openai_client() -> "openai.AsyncOpenAI":
+    return ClientRegistry().get_client("openai", use_async=True)
 
-def normalize_embedding(embedding):
-    norm = np.linalg.norm(embedding)
-    return embedding / norm if norm > 0 else embedding
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder():
+    """Loads the SentenceTransformer model on first use."""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                from sentence_transformers import SentenceTransformer
+                logger.info("Loading SentenceTransformer model")
+                _encoder = SentenceTransformer("paraphrase-distilroberta-base-v2")
+    return _encoder
 
 
 def get_embedding(text):
-    return model.encode(text)
+    return get_encoder().encode(text)
 
 
-def query_faiss(text,threshold):
-    if threshold is None:
-        threshold = 0.7
-    embedding = get_embedding(text)
-    normalized_embedding = normalize_embedding(embedding)
-    distances, indices = faiss_index.search(np.array([normalized_embedding]), k=1)
+embedding_service = EmbeddingService(
+    encode=lambda texts: get_encoder().encode(texts, batch_size=Config.EMBEDDING_MAX_BATCH_SIZE, convert_to_numpy=True),
+    max_batch_size=Config.EMBEDDING_MAX_BATCH_SIZE,
+    batch_window_ms=Config.EMBEDDING_BATCH_WINDOW_MS,
+    workers=Config.EMBEDDING_WORKERS
+)
+
+
+# Separate caches per call type so general and final message answers can't collide
+CACHE_NAMESPACES = ("general", "final_message")
+response_caches = {}
+_response_caches_lock = threading.Lock()
 
 
-    return icd_codes[indices[0][0]] if distances[0][0] > threshold else None
+def get_response_cache(namespace):
+    """Creates (and loads from disk) the response cache of a namespace on first use."""
+    if namespace not in response_caches:
+        with _response_caches_lock:
+            if namespace not in response_caches:
+                from services.semantic_cache_service import SemanticCache
+                response_caches[namespace] = SemanticCache(
+                    namespace=namespace,
+                    embed=get_embedding,
+                    embed_async=embedding_service.embed,
+                    quantization=Config.EMBEDDING_QUANTIZATION,
+                    dimension=dimension,
+                    max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES,
+                    ttl_seconds=Config.SEMANTIC_CACHE_TTL_SECONDS,
+                    ann_threshold=Config.SEMANTIC_CACHE_ANN_THRESHOLD,
+                    persist_dir=Config.SEMANTIC_CACHE_DIR
+                )
+    return response_caches[namespace]
 
-def add_to_faiss(chief_complaint, icd_code):
+
+def warm_up():
+    """Eagerly creates everything that is otherwise initialized on first use."""
+    logger.info("Warming up AI clients, encoder and response caches")
+    get_groq_client()
+    get_openai_client()
+    get_async_groq_client()
+    get_async_openai_client()
+    get_embedding("warm up")
+    for namespace in CACHE_NAMESPACES:
+        get_response_cache(namespace)
+    logger.info("Warm up complete")
+
+
+def query_faiss(namespace, text, threshold):
+    if threshold is None:
+        threshold = 0.7
+    return get_response_cache(namespace).lookup(text, threshold)
+
+def add_to_faiss(namespace, prompt, response):
     """
-    Add a new chief complaint and corresponding ICD code to the FAISS index.
+    Add a prompt and its LLM response to the semantic cache of the given namespace.
 
     Args:
-        chief_complaint (str): The medical chief complaint text
-        icd_code (str): The corresponding ICD code to be stored
+        namespace (str): Cache namespace, one of greeting, general or final_message
+        prompt (str): The prompt sent to the LLM
+        response (str): The LLM response to be stored
     """
     try:
-        # Get embedding for the chief complaint
-        embedding = get_embedding(chief_complaint)
-
-        # Normalize the embedding
-        normalized_embedding = normalize_embedding(embedding)
+        get_response_cache(namespace).add(prompt, response)
+    except Exception as e:
+        logger.error(f"Error adding to {namespace} cache: {e}", exc_info=True)
 
-        # Add to FAISS index
-        faiss_index.add(np.array([normalized_embedding]))
 
-        # Store the ICD code
-        icd_codes.append(icd_code)
+async def query_faiss_async(namespace, text, threshold):
+    if threshold is None:
+        threshold = 0.7
+    return await get_response_cache(namespace).lookup_async(text, threshold)
 
-        print(f"Successfully added to FAISS index. Current index size: {len(icd_codes)}")
 
+async def add_to_faiss_async(namespace, prompt, response):
+    try:
+        await get_response_cache(namespace).add_async(prompt, response)
     except Exception as e:
-        print(f"Error adding to FAISS index: {e}")
+        logger.error(f"Error adding to {namespace} cache: {e}", exc_info=True)
+
+
+def save_response_caches():
+    for cache in response_caches.values():
+        cache.save()
 @track_execution_time()
 def make_api_call_general(prompt: str) -> str:
     llm_response = Config.DEFAULT_GENERAL_RESPONSE
     try:
-        resp = query_faiss(prompt,Config.GENERAL_CONVERSATION_CACHE_THRESHOLD)
+        resp = query_faiss("general", prompt, Config.GENERAL_CONVERSATION_CACHE_THRESHOLD)
         if resp:
             logger.info("From FAISS Cache")
             return resp
         logger.info(f"Making API call to {Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT}")
         if Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT == "groq":
-            response = client.chat.completions.create(
+            response = get_groq_client().chat.completions.create(
                 model=Config.GENERAL_CONVERSATION_SELECTED_MODEL_GROQ,
                 messages=[
                     {"role": "system",
@@ -111,7 +164,7 @@ def make_api_call_general(prompt: str) -> str:
             llm_response = response.choices[0].message.content
             # return response.choices[0].message.content
         elif Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT == 'openai':
-            response = open_ai_client.chat.completions.create(
+            response = get_openai_client().chat.completions.create(
                 model=Config.GENERAL_CONVERSATION_SELECTED_MODEL_OPENAI,
                 messages=[
                     {"role": "system",
@@ -124,7 +177,7 @@ def make_api_call_general(prompt: str) -> str:
             llm_response = response.choices[0].message.content
             # return response.choices[0].message.content
         elif Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT == 'claude':
-            response = client.completions.create(
+            response = get_groq_client().completions.create(
                 model=Config.get_model_name(),
                 prompt=f"Human: {prompt}\n\nAssistant:",
                 max_tokens_to_sample=1000
@@ -133,7 +186,7 @@ def make_api_call_general(prompt: str) -> str:
             return response.completion
 
         # adding to cache
-        add_to_faiss(prompt, llm_response)
+        add_to_faiss("general", prompt, llm_response)
         return llm_response
     except Exception as e:
         logger.error(f"Error in {Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT} API call: {str(e)}", exc_info=True)
@@ -141,13 +194,13 @@ def make_api_call_general(prompt: str) -> str:
 def make_api_call_final_message(prompt: str) -> str:
     llm_response = Config.DEFAULT_FINAL_RESPONSE
     try:
-        resp = query_faiss(prompt, Config.GENERAL_CONVERSATION_CACHE_THRESHOLD)
+        resp = query_faiss("final_message", prompt, Config.GENERAL_CONVERSATION_CACHE_THRESHOLD)
         if resp:
             logger.info("From FAISS Cache")
             return resp
         logger.info(f"Making API call to {Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT}")
         if Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT == "groq":
-            response = client.chat.completions.create(
+            response = get_groq_client().chat.completions.create(
                 model=Config.MODEL_FINAL_MSG_SELECTED_MODEL_GROQ,
                 messages=[
                     {"role": "system",
@@ -160,7 +213,7 @@ def make_api_call_final_message(prompt: str) -> str:
             llm_response = response.choices[0].message.content
             # return response.choices[0].message.content
         elif Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT == 'openai':
-            response = open_ai_client.chat.completions.create(
+            response = get_openai_client().chat.completions.create(
                 model=Config.MODEL_FINAL_MSG_MODEL_OPENAI,
                 messages=[
                     {"role": "system",
@@ -173,7 +226,7 @@ def make_api_call_final_message(prompt: str) -> str:
             llm_response = response.choices[0].message.content
             # return response.choices[0].message.content
         elif Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT == 'claude':
-            response = client.completions.create(
+            response = get_groq_client().completions.create(
                 model=Config.get_model_name(),
                 prompt=f"Human: {prompt}\n\nAssistant:",
                 max_tokens_to_sample=1000
@@ -182,7 +235,7 @@ def make_api_call_final_message(prompt: str) -> str:
             return response.completion
 
         # adding to cache
-        add_to_faiss(prompt, llm_response)
+        add_to_faiss("final_message", prompt, llm_response)
         return llm_response
     except Exception as e:
         logger.error(f"Error in {Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT} API call: {str(e)}", exc_info=True)
@@ -191,7 +244,7 @@ def make_api_call_greeting(prompt: str) -> str:
     try:
         logger.info(f"Making API call to {Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT.value}")
         if Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT == "groq":
-            response = client.chat.completions.create(
+            response = get_groq_client().chat.completions.create(
                 model=Config.get_model_name(),
                 messages=[
                     {"role": "system",
@@ -203,7 +256,7 @@ def make_api_call_greeting(prompt: str) -> str:
             logger.debug(f"Groq API response: {response.choices[0].message.content}")
             return response.choices[0].message.content
         elif Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT == "openai":
-            response = client.chat.completions.create(
+            response = get_groq_client().chat.completions.create(
                 model=Config.get_model_name(),
                 messages=[
                     {"role": "system",
@@ -215,7 +268,7 @@ def make_api_call_greeting(prompt: str) -> str:
             logger.debug(f"OpenAI API response: {response.choices[0].message.content}")
             return response.choices[0].message.content
         elif Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT == "claude":
-            response = client.completions.create(
+            response = get_groq_client().completions.create(
                 model=Config.get_model_name(),
                 prompt=f"Human: {prompt}\n\nAssistant:",
                 max_tokens_to_sample=1000
@@ -231,7 +284,7 @@ def make_api_call_missing(prompt: str) -> str:
     try:
         logger.info(f"Making API call to {Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT}")
         if Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT == "groq":
-            response = client.chat.completions.create(
+            response = get_groq_client().chat.completions.create(
                 model=Config.MODEL_FINAL_MSG_SELECTED_MODEL_GROQ,
                 messages=[
                     {"role": "system",
@@ -243,7 +296,7 @@ def make_api_call_missing(prompt: str) -> str:
             logger.debug(f"Groq API response: {response.choices[0].message.content}")
             return response.choices[0].message.content
         elif Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT == "openai":
-            response = open_ai_client.chat.completions.create(
+            response = get_openai_client().chat.completions.create(
                 model=Config.MODEL_FINAL_MSG_MODEL_OPENAI,
                 messages=[
                     {"role": "system",
@@ -255,7 +308,7 @@ def make_api_call_missing(prompt: str) -> str:
             logger.debug(f"OpenAI API response: {response.choices[0].message.content}")
             return response.choices[0].message.content
         elif Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT == "claude":
-            response = client.completions.create(
+            response = get_groq_client().completions.create(
                 model=Config.MODEL_FINAL_MSG_SELECTED_MODEL_GROQ,
                 prompt=f"Human: {prompt}\n\nAssistant:",
                 max_tokens_to_sample=1000
@@ -266,17 +319,17 @@ def make_api_call_missing(prompt: str) -> str:
         logger.error(f"Error in {Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT} API call: {str(e)}", exc_info=True)
         raise APICallError(Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT, str(e))
 
-def make_image_api_call(prompt: str, image_data: str) -> str:
+def make_image_api_call(prompt: str, image_data: str, mime_type: str = "image/png") -> str:
     try:
         logger.info("Making image API call to OpenAI")
-        response = open_ai_client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model=Config.MODEL_IMAGE_OPENAI,
             messages=[
                 {
                     "role": "user",
                     "content": [
                         {"type": "text", "text": prompt},
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_data}"}}
+                        {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}}
                     ]
                 }
             ],
@@ -309,8 +362,8 @@ def make_classification_call(prompt: str) -> str:
             classification: Literal["product_related", "general_conversation"]
             
         if Config.CLASSIFICATION_SELECTED_MODEL_CLIENT == "groq":
-            # Use instructor-patched client for Groq
-            patched_client = instructor.patch(groq_client)
+            # Use the shared instructor-patched client for Groq
+            patched_client = ClientRegistry().get_instructor_client("groq")
             response = patched_client.chat.completions.create(
                 model=Config.CLASSIFICATION_SELECTED_MODEL_GROQ,
                 messages=[
@@ -321,8 +374,8 @@ def make_classification_call(prompt: str) -> str:
             result = json.dumps({"classification": response.classification})
             
         elif Config.CLASSIFICATION_SELECTED_MODEL_CLIENT == "openai":
-            # Use instructor-patched client for OpenAI
-            patched_client = instructor.patch(open_ai_client)
+            # Use the shared instructor-patched client for OpenAI
+            patched_client = ClientRegistry().get_instructor_client("openai")
             response = patched_client.chat.completions.create(
                 model=Config.CLASSIFICATION_SELECTED_MODEL_OPENAI,
                 messages=[
@@ -344,5 +397,223 @@ def make_classification_call(prompt: str) -> str:
         logger.error(f"Error in classification API call: {str(e)}", exc_info=True)
         raise APICallError(Config.SELECTED_MODEL.value, str(e))
 
-# Initialize clients when this module is imported
-# initialize_clients()
\ No newline at end of file
+class ConversationClassification(BaseModel):
+    classification: Literal["product_related", "general_conversation"]
+
+
+async def _chat_completion_async(provider: str, model_name: str, prompt: str, max_tokens: int,
+                                 on_token: TokenCallback = None,
+                                 messages: Optional[List[Dict[str, str]]] = None) -> str:
+    """
+    Makes a non-blocking chat completion call against the given provider.
+
+    Args:
+        provider (str): Client name from Config, either "groq" or "openai"
+        model_name (str): Model to use for the completion
+        prompt (str): User prompt
+        max_tokens (int): Maximum number of tokens to generate
+        on_token (TokenCallback): If given, the completion is streamed and every
+            content delta is passed to it as it arrives
+        messages (Optional[List[Dict[str, str]]]): Prebuilt chat messages, e.g. from
+            a compiled prompt, sent instead of the default system message and prompt
+
+    Returns:
+        str: Content of the first completion choice
+    """
+    if provider == "groq":
+        llm_client = get_async_groq_client()
+    elif provider == "openai":
+        llm_client = get_async_openai_client()
+    else:
+        raise InvalidModelError(provider)
+
+    if messages is None:
+        messages = [
+            {"role": "system",
+             "content": "You are a helpful assistant that extracts information and formats it as JSON."},
+            {"role": "user", "content": prompt}
+        ]
+
+    if on_token is None:
+        response = await llm_client.chat.completions.create(
+            model=model_name,
+            messages=messages,
+            max_tokens=max_tokens
+        )
+        logger.debug(f"{provider} API response: {response.choices[0].message.content}")
+        return response.choices[0].message.content
+
+    stream = await llm_client.chat.completions.create(
+        model=model_name,
+        messages=messages,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    parts = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            await on_token(delta)
+    content = "".join(parts)
+    logger.debug(f"{provider} streamed API response: {content}")
+    return content
+
+
+@track_execution_time()
+async def make_api_call_general_async(prompt: str, on_token: TokenCallback = None) -> str:
+    provider = Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT
+    try:
+        resp = await query_faiss_async("general", prompt, Config.GENERAL_CONVERSATION_CACHE_THRESHOLD)
+        if resp:
+            logger.info("From FAISS Cache")
+            if on_token is not None:
+                await on_token(resp)
+            return resp
+        logger.info(f"Making async API call to {provider}")
+        if provider == "openai":
+            llm_response = await _chat_completion_async(
+                provider, Config.GENERAL_CONVERSATION_SELECTED_MODEL_OPENAI, prompt, 200, on_token)
+        else:
+            llm_response = await _chat_completion_async(
+                provider, Config.GENERAL_CONVERSATION_SELECTED_MODEL_GROQ, prompt, 500, on_token)
+
+        # adding to cache
+        await add_to_faiss_async("general", prompt, llm_response)
+        return llm_response
+    except Exception as e:
+        logger.error(f"Error in {provider} API call: {str(e)}", exc_info=True)
+        raise APICallError(provider, str(e))
+
+
+async def make_api_call_final_message_async(prompt: str, on_token: TokenCallback = None,
+                                            messages: Optional[List[Dict[str, str]]] = None) -> str:
+    provider = Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT
+    try:
+        resp = await query_faiss_async("final_message", prompt, Config.GENERAL_CONVERSATION_CACHE_THRESHOLD)
+        if resp:
+            logger.info("From FAISS Cache")
+            if on_token is not None:
+                await on_token(resp)
+            return resp
+        logger.info(f"Making async API call to {provider}")
+        if provider == "openai":
+            llm_response = await _chat_completion_async(
+                provider, Config.MODEL_FINAL_MSG_MODEL_OPENAI, prompt, 200, on_token, messages)
+        else:
+            llm_response = await _chat_completion_async(
+                provider, Config.MODEL_FINAL_MSG_SELECTED_MODEL_GROQ, prompt, 500, on_token, messages)
+
+        # adding to cache
+        await add_to_faiss_async("final_message", prompt, llm_response)
+        return llm_response
+    except Exception as e:
+        logger.error(f"Error in {provider} API call: {str(e)}", exc_info=True)
+        raise APICallError(provider, str(e))
+
+
+async def make_api_call_structured_async(prompt: str, messages: Optional[List[Dict[str, str]]] = None) -> str:
+    """
+    Uncached JSON completion on the final message model, for extraction and
+    confirmation fallbacks whose answers must not share the final message cache.
+    """
+    provider = Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT
+    try:
+        logger.info(f"Making async API call to {provider}")
+        if provider == "openai":
+            return await _chat_completion_async(
+                provider, Config.MODEL_FINAL_MSG_MODEL_OPENAI, prompt, 200, messages=messages)
+        return await _chat_completion_async(
+            provider, Config.MODEL_FINAL_MSG_SELECTED_MODEL_GROQ, prompt, 500, messages=messages)
+    except Exception as e:
+        logger.error(f"Error in {provider} API call: {str(e)}", exc_info=True)
+        raise APICallError(provider, str(e))
+
+
+async def make_api_call_greeting_async(prompt: str, on_token: TokenCallback = None) -> str:
+    """Async port of make_api_call_greeting, same model and token limits and likewise uncached."""
+    provider = Config.GENERAL_CONVERSATION_SELECTED_MODEL_CLIENT
+    try:
+        logger.info(f"Making async API call to {provider}")
+        # As in make_api_call_greeting, both branches call the Groq client with the selected model
+        if provider == "openai":
+            return await _chat_completion_async("groq", Config.get_model_name(), prompt, 200, on_token)
+        return await _chat_completion_async("groq", Config.get_model_name(), prompt, 1200, on_token)
+    except Exception as e:
+        logger.error(f"Error in {provider} API call: {str(e)}", exc_info=True)
+        raise APICallError(provider, str(e))
+
+
+async def make_api_call_missing_async(prompt: str, on_token: TokenCallback = None) -> str:
+    provider = Config.MODEL_FINAL_MSG_SELECTED_MODEL_CLIENT
+    try:
+        logger.info(f"Making async API call to {provider}")
+        if provider == "openai":
+            return await _chat_completion_async(
+                provider, Config.MODEL_FINAL_MSG_MODEL_OPENAI, prompt, 200, on_token)
+        return await _chat_completion_async(
+            provider, Config.MODEL_FINAL_MSG_SELECTED_MODEL_GROQ, prompt, 1200, on_token)
+    except Exception as e:
+        logger.error(f"Error in {provider} API call: {str(e)}", exc_info=True)
+        raise APICallError(provider, str(e))
+
+
+async def make_image_api_call_async(prompt: str, image_data: str, mime_type: str = "image/png") -> str:
+    try:
+        logger.info("Making async image API call to OpenAI")
+        response = await get_async_openai_client().chat.completions.create(
+            model=Config.MODEL_IMAGE_OPENAI,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}}
+                    ]
+                }
+            ],
+            max_tokens=1000
+        )
+        logger.debug(f"OpenAI image API response: {response.choices[0].message.content}")
+        return response.choices[0].message.content
+    except Exception as e:
+        logger.error(f"Error in OpenAI image API call: {str(e)}", exc_info=True)
+        raise APICallError(Config.MODEL_IMAGE_OPENAI, str(e))
+
+
+async def make_classification_call_async(prompt: str) -> str:
+    """
+    Async counterpart of make_classification_call.
+
+    Args:
+        prompt (str): The formatted classification prompt
+
+    Returns:
+        str: JSON string containing the classification result
+    """
+    provider = Config.CLASSIFICATION_SELECTED_MODEL_CLIENT
+    try:
+        logger.info("Making async classification API call")
+        if provider == "groq":
+            patched_client = ClientRegistry().get_instructor_client("groq", use_async=True)
+            model_name = Config.CLASSIFICATION_SELECTED_MODEL_GROQ
+        elif provider == "openai":
+            patched_client = ClientRegistry().get_instructor_client("openai", use_async=True)
+            model_name = Config.CLASSIFICATION_SELECTED_MODEL_OPENAI
+        else:
+            raise InvalidModelError(provider)
+
+        response = await patched_client.chat.completions.create(
+            model=model_name,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            response_model=ConversationClassification
+        )
+        result = json.dumps({"classification": response.classification})
+        logger.debug(f"Classification API response: {result}")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error in classification API call: {str(e)}", exc_info=True)
+        raise APICallError(provider, str(e))
@@ -0,0 +1,112 @@
+import importlib.util
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from upc.config import Config
+from upc.exceptions import InvalidModelError
+from upc.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ClientRegistry:
+    """
+    Singleton owning one pooled HTTP client per provider and the instructor
+    wrappers built on top of them, so every call reuses the same keep-alive
+    connections instead of re-creating clients or re-patching them.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._clients = {}
+                    cls._instance._lock = threading.RLock()  # instructor wrappers build their client under it
+        return cls._instance
+
+    def _get(self, key: Tuple, factory: Callable[[], Any]) -> Any:
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    # Without the trailing API key, which must not end up in the logs
+                    logger.info(f"Initializing client {key[:3]}")
+                    client = factory()
+                    self._clients[key] = client
+        return client
+
+    @staticmethod
+    def _http_options(provider: str) -> Dict[str, Any]:
+        import httpx
+        http2 = provider in Config.LLM_HTTP2_PROVIDERS
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(f"HTTP/2 requested for {provider} but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+        return {
+            "limits": httpx.Limits(
+                max_connections=Config.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=Config.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            "timeout": httpx.Timeout(Config.LLM_HTTP_TIMEOUT_SECONDS, connect=Config.LLM_HTTP_CONNECT_TIMEOUT_SECONDS),
+            "http2": http2
+        }
+
+    @staticmethod
+    def _api_key(provider: str, api_key: Optional[str]) -> Optional[str]:
+        if api_key:
+            return api_key
+        return os.getenv({"groq": "GROQ_API_KEY", "openai": "OPENAI_API_KEY"}.get(provider, ""))
+
+    def _build_client(self, provider: str, use_async: bool, api_key: Optional[str]):
+        # The SDKs are imported here, so importing the registry doesn't load them at startup
+        import httpx
+        options = self._http_options(provider)
+        if provider == "groq":
+            import groq
+            if use_async:
+                return groq.AsyncGroq(api_key=api_key, http_client=httpx.AsyncClient(**options))
+            return groq.Groq(api_key=api_key, http_client=httpx.Client(**options))
+        if provider == "openai":
+            import openai
+            if use_async:
+                return openai.AsyncOpenAI(api_key=api_key, http_client=httpx.AsyncClient(**options))
+            return openai.OpenAI(api_key=api_key, http_client=httpx.Client(**options))
+        raise InvalidModelError(provider)
+
+    def get_client(self, provider: str, use_async: bool = False, api_key: Optional[str] = None):
+        """
+        Returns the shared Groq/OpenAI SDK client for a provider. The key defaults
+        to the provider's environment variable, callers with the same key share a client.
+        """
+        api_key = self._api_key(provider, api_key)
+        return self._get(("client", provider, use_async, api_key),
+                         lambda: self._build_client(provider, use_async, api_key))
+
+    def get_instructor_client(self, provider: str, use_async: bool = False, api_key: Optional[str] = None):
+        """Returns the shared instructor wrapper around the provider client."""
+        api_key = self._api_key(provider, api_key)
+
+        def build():
+            import instructor
+            client = self.get_client(provider, use_async, api_key)
+            if provider == "groq":
+                return instructor.from_groq(client, mode=instructor.Mode.TOOLS)
+            return instructor.from_openai(client)
+        return self._get(("instructor", provider, use_async, api_key), build)
+
+    async def aclose(self) -> None:
+        """Closes all pooled connections, called on application shutdown."""
+        with self._lock:
+            # (client, use_async) pairs, the key is ("client", provider, use_async, api_key)
+            clients = [(client, key[2]) for key, client in self._clients.items() if key[0] == "client"]
+            self._clients.clear()
+        for client, use_async in clients:
+            if use_async:
+                await client.close()
+            else:
+                client.close()
@@ -1,12 +1,15 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from models.conversation_models import MessageItem, Message, ConversationRequest
-from services.ai_client_service import make_api_call_general, make_api_call_greeting
+from services.ai_client_service import make_api_call_general, make_api_call_greeting, make_api_call_general_async, make_api_call_greeting_async, TokenCallback
 from utils.prompts import Prompts
-from services.plan_extractor_service import extract_plan
+from services.plan_extractor_service import extract_plan_async, extract_plan_delta_async
+from upc.config import Config
+from upc.exceptions import JSONParseError
+from services.state_store_service import get_state_store
+from utils.conversation_context import ConversationContext
 from upc.logger import setup_logger
 
 logger = setup_logger(__name__)
-schema_cache = {}
 def format_messages(messages: List[MessageItem]) -> List[Message]:
     logger.debug(f"Formatting {len(messages)} messages")
     return [
@@ -24,12 +27,35 @@ def handle_greeting(username: str) -> str:
     logger.debug(f"Greeting response: {response.strip()}")
     return response.strip()
 
-async def handle_conversation(request: ConversationRequest) -> Dict[str, Any]:
+async def handle_greeting_async(username: str, on_token: TokenCallback = None) -> str:
+    logger.info(f"Handling greeting for user: {username}")
+    prompt = Prompts.AI_GREETING_PROMPT.format(user_name=username)
+    response = await make_api_call_greeting_async(prompt, on_token)
+    logger.debug(f"Greeting response: {response.strip()}")
+    return response.strip()
+
+async def handle_conversation(request: ConversationRequest, context: Optional[ConversationContext] = None) -> Dict[str, Any]:
     logger.info(f"Handling conversation for conversation ID: {request.conversationId}")
-    all_messages = request.previousMessages + [request.currentMessage]
-    if len(all_messages) > 6:
-        all_messages = all_messages[-4:]
-    formatted_messages = format_messages(all_messages)
+    if context is None:
+        context = ConversationContext(request)
+    state_store = get_state_store()
+    message_count = len(context.messages)
+    start = 0
+    stored_plan = None
+    state = await state_store.get(request.conversationId)
+    if state is not None and state["message_count"] >= message_count:
+        # The history was reset or shrank, the stored plan belongs to an earlier flow
+        logger.info(f"Discarding stored plan for {request.conversationId}, history is no longer ahead of it")
+        await state_store.delete(request.conversationId)
+        state = None
+    if state is not None and 0 < state["message_count"] < message_count:
+        stored_plan = state["plan"]
+        # Only the messages since the last extraction need to be merged into the stored plan,
+        # that is the assistant reply to the previous turn plus the new user message
+        logger.info(f"Merging new messages into stored plan for {request.conversationId}")
+        start = state["message_count"]
+    serialized_messages = context.history(
+        Config.HISTORY_EXTRACTION_TOKEN_BUDGET, Config.HISTORY_EXTRACTION_MAX_MESSAGES, start)
     product_schema = {
         "product_name": "",
         "product_description": "",
@@ -43,19 +69,38 @@ async def handle_conversation(request: ConversationRequest) -> Dict[str, Any]:
         "data_allowance":"",
         "voice_allowance":""
     }
-    if schema_cache.get(request.conversationId) is not None:
-        logger.info(f"taking from schema cache for {request.conversationId}")
-        product_schema = schema_cache.get(request.conversationId)
+    if stored_plan is not None:
+        logger.info(f"taking from state store for {request.conversationId}")
+        product_schema = stored_plan
     logger.debug(f"Extracting plan with schema: {product_schema}")
-    extracted_plan = extract_plan(formatted_messages, product_schema)
+    extracted_plan = None
+    if Config.PLAN_EXTRACTION_MODE == "delta" and stored_plan is not None:
+        try:
+            extracted_plan = await extract_plan_delta_async(request.currentMessage.payload.text, stored_plan)
+        except JSONParseError:
+            logger.warning(f"Delta extraction failed for {request.conversationId}, falling back to full extraction")
+    if extracted_plan is None:
+        extracted_plan = await extract_plan_async(serialized_messages, product_schema)
     logger.debug(f"Extracted plan: {extracted_plan}")
-    product_schema[request.conversationId] = extracted_plan
+    await state_store.set(request.conversationId, {"plan": extracted_plan, "message_count": message_count})
     return extracted_plan
 
+async def clear_conversation_state(conversation_id: str) -> None:
+    """Forgets the stored plan once it was confirmed or reset, the next product starts from scratch."""
+    logger.info(f"Clearing stored plan for {conversation_id}")
+    await get_state_store().delete(conversation_id)
+
 def handle_conversation_general(message: str) -> str:
     logger.info("Handling general conversation")
     prompt = Prompts.AI_RESPONSE_PROMPT.format(incoming_message=message)
     # response = make_api_call(prompt)
     response = make_api_call_general(prompt)
     logger.debug(f"General conversation response: {response.strip()}")
-    return response.strip()
\ No newline at end of file
+    return response.strip()
+
+async def handle_conversation_general_async(message: str, on_token: TokenCallback = None) -> str:
+    logger.info("Handling general conversation")
+    prompt = Prompts.AI_RESPONSE_PROMPT.format(incoming_message=message)
+    response = await make_api_call_general_async(prompt, on_token)
+    logger.debug(f"General conversation response: {response.strip()}")
+    return response.strip()
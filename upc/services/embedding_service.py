@@ -0,0 +1,80 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from upc.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EmbeddingService:
+    """
+    Micro-batching front end for a sentence encoder.
+
+    Concurrent embed() calls are collected for up to batch_window_ms (or until
+    max_batch_size is reached), encoded as one batch on a dedicated thread pool
+    and the resulting vectors are handed back to each waiting caller. The event
+    loop never runs the encoder itself.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int,
+                 batch_window_ms: float, workers: int):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedding")
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._batcher is None or self._batcher.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._batcher = loop.create_task(self._batch_loop())
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Returns the embedding of text, batched with other concurrent requests."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def embed_sync(self, text: str) -> np.ndarray:
+        """Encodes a single text on the calling thread, for callers outside the event loop."""
+        return self.encode([text])[0]
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _batch_loop(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await self._loop.run_in_executor(self._executor, self.encode, texts)
+                logger.debug(f"Encoded embedding batch of {len(texts)}")
+                for (_, future), vector in zip(batch, vectors):
+                    if not future.done():
+                        future.set_result(vector)
+            except Exception as e:
+                logger.error(f"Error encoding embedding batch: {str(e)}", exc_info=True)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def shutdown(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._executor.shutdown(wait=False)
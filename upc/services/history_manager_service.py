@@ -0,0 +1,135 @@
+import importlib.util
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from models.conversation_models import MessageItem
+from upc.config import Config
+from upc.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Per-message overhead of the role and JSON punctuation, in tokens
+MESSAGE_TOKEN_OVERHEAD = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def _get_encoding():
+    """Loads the tiktoken encoding on first use, None if tiktoken is unavailable."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                if importlib.util.find_spec("tiktoken") is None:
+                    logger.info("tiktoken is not installed, estimating token counts from text length")
+                    _encoding_failed = True
+                else:
+                    try:
+                        import tiktoken
+                        _encoding = tiktoken.get_encoding(Config.HISTORY_TOKENIZER_ENCODING)
+                    except Exception as e:
+                        logger.warning(f"Could not load tiktoken encoding, estimating token counts: {str(e)}")
+                        _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens with tiktoken when available, otherwise estimates roughly 4 characters per token."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def format_history(messages: List[MessageItem]) -> List[Dict[str, str]]:
+    """Converts request messages to the role/content dicts used in prompts."""
+    return [
+        {"role": "user" if msg.source == "ui" else "assistant", "content": msg.payload.text or ""}
+        for msg in messages
+    ]
+
+
+class HistoryManager:
+    """
+    Builds the conversation context for each prompt under an explicit token budget.
+
+    The newest messages are kept first and older ones are dropped once the budget
+    (or max_messages) is reached; the newest message is always kept. Token counts
+    and serialized windows are cached per conversation, so the same history is
+    counted and serialized once even though several prompts in a request and the
+    following turns reuse it.
+    """
+
+    def __init__(self, max_conversations: int):
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, conversation_id: str) -> dict:
+        with self._lock:
+            state = self._conversations.get(conversation_id)
+            if state is None:
+                state = {"token_counts": {}, "serialized": {}}
+                self._conversations[conversation_id] = state
+                while len(self._conversations) > self.max_conversations:
+                    self._conversations.popitem(last=False)
+            else:
+                self._conversations.move_to_end(conversation_id)
+            return state
+
+    def window(self, conversation_id: str, messages: List[Dict[str, str]], token_budget: int,
+               max_messages: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Returns the most recent messages that fit in token_budget.
+
+        Args:
+            conversation_id (str): Conversation the messages belong to, used for caching
+            messages (List[Dict[str, str]]): Formatted messages, oldest first
+            token_budget (int): Maximum number of tokens for the selected messages
+            max_messages (Optional[int]): Maximum number of messages to keep
+
+        Returns:
+            List[Dict[str, str]]: The selected messages, oldest first
+        """
+        token_counts = self._state(conversation_id)["token_counts"]
+        limit = len(messages) if max_messages is None else min(max_messages, len(messages))
+        used = 0
+        start = len(messages)
+        while start > len(messages) - limit:
+            content = messages[start - 1]["content"]
+            tokens = token_counts.get(content)
+            if tokens is None:
+                tokens = count_tokens(content) + MESSAGE_TOKEN_OVERHEAD
+                token_counts[content] = tokens
+            if used + tokens > token_budget and start < len(messages):
+                break
+            used += tokens
+            start -= 1
+        if start > 0:
+            logger.debug(f"History for {conversation_id} trimmed to {len(messages) - start} messages, {used} tokens")
+        return messages[start:]
+
+    def serialize(self, conversation_id: str, messages: List[Dict[str, str]], token_budget: int,
+                  max_messages: Optional[int] = None) -> str:
+        """Same as window, returned as the JSON string used in prompts."""
+        selected = self.window(conversation_id, messages, token_budget, max_messages)
+        serialized_cache = self._state(conversation_id)["serialized"]
+        key = tuple((msg["role"], msg["content"]) for msg in selected)
+        serialized = serialized_cache.get(key)
+        if serialized is None:
+            serialized = json.dumps(selected, separators=(",", ":"), ensure_ascii=False)
+            # Only the windows of the current turn are worth keeping
+            if len(serialized_cache) >= Config.HISTORY_SERIALIZED_PER_CONVERSATION:
+                serialized_cache.clear()
+            serialized_cache[key] = serialized
+        return serialized
+
+    def forget(self, conversation_id: str) -> None:
+        with self._lock:
+            self._conversations.pop(conversation_id, None)
+
+
+history_manager = HistoryManager(Config.HISTORY_CACHE_MAX_CONVERSATIONS)
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from upc.logger import setup_logger
+from upc.metric_logger import MetricLogger
+
+logger = setup_logger(__name__)
+
+
+class ImageResultCache:
+    """
+    Disk-backed, size-bounded cache of vision extraction results.
+
+    Entries are keyed by the image pixel hash together with a hash of the
+    extraction prompt, so editing the prompt invalidates old results without
+    clearing the file. Once max_entries is exceeded the least recently used
+    entries are deleted. The sqlite file survives restarts and can be shared
+    by several workers on the same host.
+    """
+
+    def __init__(self, path: str, max_entries: int, prompt: str):
+        self.path = path
+        self.max_entries = max_entries
+        self.prompt_version = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS image_results ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_image_results_last_used ON image_results (last_used)")
+        self._conn.commit()
+
+    def _key(self, content_hash: str) -> str:
+        return f"{self.prompt_version}:{content_hash}"
+
+    def _record(self, hit: bool) -> None:
+        self.stats["hits" if hit else "misses"] += 1
+        total = self.stats["hits"] + self.stats["misses"]
+        MetricLogger().log_event(
+            "image_cache_lookup",
+            additional_data={"hit": hit, **self.stats, "hit_rate": round(self.stats["hits"] / total, 4)}
+        )
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """Returns the cached extraction for an image hash, if any."""
+        key = self._key(content_hash)
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM image_results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE image_results SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        self._record(row is not None)
+        return row[0] if row is not None else None
+
+    def set(self, content_hash: str, content: str) -> None:
+        """Stores an extraction result, evicting least recently used entries past max_entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO image_results (key, content, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (self._key(content_hash), content, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM image_results WHERE key IN ("
+                "SELECT key FROM image_results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+        logger.debug(f"Cached image extraction for {content_hash}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,95 @@
+import base64
+import binascii
+import hashlib
+from io import BytesIO
+from typing import NamedTuple
+from PIL import Image, ImageOps, UnidentifiedImageError
+from upc.config import Config
+from upc.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MIME_TYPES = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+
+
+class PreparedImage(NamedTuple):
+    """Image payload ready for the vision call"""
+    data: str  # base64 without data URL prefix
+    mime_type: str
+    content_hash: str  # hash of the downsized pixels, identical screenshots share it
+
+
+def _strip_data_url(image_data: str) -> str:
+    if image_data.startswith("data:") and "," in image_data:
+        return image_data.split(",", 1)[1]
+    return image_data
+
+
+def _target_size(width: int, height: int):
+    """
+    Smallest size the vision model works at: it fits images into a
+    IMAGE_MAX_LONG_SIDE square and then scales the short side down to
+    IMAGE_MAX_SHORT_SIDE, so anything larger is only upload overhead.
+    """
+    scale = min(1.0,
+                Config.IMAGE_MAX_LONG_SIDE / max(width, height),
+                Config.IMAGE_MAX_SHORT_SIDE / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _encode(image: Image.Image, image_format: str) -> bytes:
+    buffer = BytesIO()
+    if image_format == "JPEG":
+        image.convert("RGB").save(buffer, format="JPEG", quality=Config.IMAGE_JPEG_QUALITY, optimize=True)
+    else:
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def prepare_image(image_data: str) -> PreparedImage:
+    """
+    Decodes a base64 image once, detects its real format, downsizes and
+    recompresses it for the vision model and hashes its downsized pixels.
+
+    Payloads that can't be decoded as an image are passed through unchanged
+    so the vision call can still report on them.
+    """
+    image_data = _strip_data_url(image_data)
+    try:
+        raw = base64.b64decode(image_data, validate=False)
+        image = Image.open(BytesIO(raw))
+        source_format = image.format
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+        target = _target_size(width, height)
+        resized = target != (width, height)
+        if resized:
+            image = image.resize(target, Image.LANCZOS)
+        # Hashed after downsizing, a full resolution RGBA copy is a large allocation per request
+        pixels = image.convert("RGBA")
+        content_hash = hashlib.sha256(f"{pixels.size}".encode("utf-8") + pixels.tobytes()).hexdigest()
+    except (binascii.Error, UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+        # DecompressionBombError is not an OSError, oversized uploads would otherwise fail the turn
+        logger.warning(f"Could not decode image payload, sending it unchanged: {str(e)}")
+        return PreparedImage(image_data, "image/png", hashlib.sha256(image_data.encode("utf-8")).hexdigest())
+
+    # Screenshots stay PNG (sharp text) unless that is still too large, photos become JPEG
+    output_format = "PNG" if source_format in ("PNG", "GIF") else "JPEG"
+    encoded = _encode(image, output_format)
+    if output_format == "PNG" and len(encoded) > Config.IMAGE_MAX_PNG_BYTES:
+        output_format = "JPEG"
+        encoded = _encode(image, output_format)
+
+    if not resized and source_format in MIME_TYPES and len(raw) <= len(encoded):
+        # Re-encoding would not make the original any smaller
+        logger.debug(f"Keeping original {source_format} image of {len(raw)} bytes")
+        return PreparedImage(image_data, MIME_TYPES[source_format], content_hash)
+
+    logger.info(f"Prepared image: {source_format} {width}x{height} {len(raw)} bytes -> "
+                f"{output_format} {target[0]}x{target[1]} {len(encoded)} bytes")
+    return PreparedImage(base64.b64encode(encoded).decode("ascii"), MIME_TYPES[output_format], content_hash)
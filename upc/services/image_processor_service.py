@@ -1,13 +1,58 @@
-from services.ai_client_service import make_image_api_call
+import asyncio
+import threading
+from services.ai_client_service import make_image_api_call, make_image_api_call_async
+from services.image_cache_service import ImageResultCache
+from services.image_preprocessor_service import prepare_image
+from services.image_worker_pool_service import image_worker_pool
 from utils.prompts import Prompts
+from upc.config import Config
 from upc.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_image_result_cache() -> ImageResultCache:
+    """Opens the persistent extraction cache on first use."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ImageResultCache(
+                    Config.IMAGE_RESULT_CACHE_PATH,
+                    Config.IMAGE_RESULT_CACHE_SIZE,
+                    Prompts.IMAGE_PRODUCT_EXTRACTION
+                )
+    return _result_cache
+
+
 class ImageProcessor:
     @staticmethod
     def extract_image_content(image_data: str) -> str:
         logger.info("Extracting content from image")
-        content = make_image_api_call(Prompts.IMAGE_PRODUCT_EXTRACTION, image_data)
+        image = prepare_image(image_data)
+        content = get_image_result_cache().get(image.content_hash)
+        if content is not None:
+            logger.info(f"Image content from cache for {image.content_hash}")
+            return content
+        content = make_image_api_call(Prompts.IMAGE_PRODUCT_EXTRACTION, image.data, image.mime_type)
+        get_image_result_cache().set(image.content_hash, content)
+        logger.debug(f"Extracted image content: {content}")
+        return content
+
+    @staticmethod
+    async def extract_image_content_async(image_data: str) -> str:
+        logger.info("Extracting content from image")
+        # Decoding and resizing is CPU bound, keep it off the event loop
+        image = await image_worker_pool.run(prepare_image, image_data)
+        cache = get_image_result_cache()
+        content = await asyncio.to_thread(cache.get, image.content_hash)
+        if content is not None:
+            logger.info(f"Image content from cache for {image.content_hash}")
+            return content
+        content = await make_image_api_call_async(Prompts.IMAGE_PRODUCT_EXTRACTION, image.data, image.mime_type)
+        await asyncio.to_thread(cache.set, image.content_hash, content)
         logger.debug(f"Extracted image content: {content}")
-        return content
\ No newline at end of file
+        return content
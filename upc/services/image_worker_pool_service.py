@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable
+from upc.config import Config
+from upc.exceptions import ServiceBusyError
+from upc.logger import setup_logger
+from upc.metric_logger import MetricLogger
+
+logger = setup_logger(__name__)
+
+
+class ImageWorkerPool:
+    """
+    Admission control for image turns.
+
+    At most max_concurrency image turns run at once and up to queue_depth more
+    wait for a slot. Anything beyond that is rejected immediately with a 429 so a
+    burst of screenshots cannot tie up the worker that text conversations share.
+    CPU bound image work runs on the pool's own threads instead of the default
+    executor.
+    """
+
+    def __init__(self, max_concurrency: int, queue_depth: int):
+        self.max_concurrency = max_concurrency
+        self.queue_depth = queue_depth
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._admitted = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="image")
+
+    @property
+    def saturated(self) -> bool:
+        return self._admitted >= self.max_concurrency + self.queue_depth
+
+    def check_capacity(self) -> None:
+        """Raises ServiceBusyError if a new image turn would be rejected."""
+        if self.saturated:
+            MetricLogger().log_event(
+                "image_pool_rejected",
+                additional_data={"admitted": self._admitted, "max_concurrency": self.max_concurrency,
+                                 "queue_depth": self.queue_depth}
+            )
+            logger.warning(f"Image worker pool saturated with {self._admitted} turns, rejecting request")
+            raise ServiceBusyError(Config.IMAGE_BUSY_RETRY_AFTER_SECONDS)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Admits an image turn, waits for a free slot and holds it for the duration of the block."""
+        self.check_capacity()
+        self._admitted += 1
+        try:
+            async with self._semaphore:
+                yield
+        finally:
+            self._admitted -= 1
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs a blocking function on the image threads."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+image_worker_pool = ImageWorkerPool(Config.IMAGE_MAX_CONCURRENCY, Config.IMAGE_QUEUE_DEPTH)
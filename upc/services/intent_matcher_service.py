@@ -0,0 +1,154 @@
+import asyncio
+import json
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from services.ai_client_service import embedding_service, get_encoder
+from upc.config import Config
+from upc.logger import setup_logger
+from upc.metric_logger import MetricLogger
+from utils.classification_utils import last_user_message, unit_rows
+
+logger = setup_logger(__name__)
+
+CHECKS = ("confirmation", "change")
+
+
+def record_decision(check: str, source: str, value: bool) -> None:
+    """Logs which tier answered a confirmation or change check."""
+    MetricLogger().log_event("intent_decision", additional_data={"check": check, "source": source, "value": value})
+
+
+class IntentMatcher:
+    """
+    Local fast path for the confirmation and change checks.
+
+    The latest user message is matched against the keyword/regex rules of the
+    rules file and, if enabled, against labelled example phrases by embedding
+    similarity. Only unambiguous, high-confidence matches return a decision;
+    anything else returns None so the caller asks the LLM.
+    """
+
+    def __init__(self, rules_path: str, use_embeddings: bool):
+        with open(rules_path) as f:
+            rules = json.load(f)
+        self.max_message_chars = rules.get("max_message_chars", 120)
+        self.patterns: Dict[str, Dict[bool, List[re.Pattern]]] = {
+            check: {
+                value: [re.compile(p, re.IGNORECASE) for p in rules.get(check, {}).get(str(value).lower(), [])]
+                for value in (True, False)
+            }
+            for check in CHECKS
+        }
+        embedding_rules = rules.get("embedding", {})
+        self.use_embeddings = use_embeddings and bool(embedding_rules.get("examples"))
+        self.threshold = embedding_rules.get("threshold", 0.85)
+        self.margin = embedding_rules.get("margin", 0.1)
+        self._examples = embedding_rules.get("examples", {})
+        self._example_vectors: Optional[Dict[str, Dict[bool, np.ndarray]]] = None
+        self._lock = threading.Lock()
+
+    def _normalize(self, text: str) -> str:
+        return re.sub(r"\s+", " ", text).strip()
+
+    def match_rules(self, check: str, text: str) -> Optional[bool]:
+        """Returns the rule decision, None when no rule or rules for both answers match."""
+        matched = {value for value, patterns in self.patterns[check].items() if any(p.search(text) for p in patterns)}
+        return matched.pop() if len(matched) == 1 else None
+
+    def _get_example_vectors(self) -> Dict[str, Dict[bool, np.ndarray]]:
+        if self._example_vectors is None:
+            with self._lock:
+                if self._example_vectors is None:
+                    encoder = get_encoder()
+                    self._example_vectors = {
+                        check: {
+                            value: unit_rows(np.asarray(encoder.encode(examples.get(str(value).lower(), [])), dtype=np.float32))
+                            for value in (True, False)
+                        }
+                        for check, examples in self._examples.items()
+                    }
+        return self._example_vectors
+
+    def match_embedding(self, check: str, embedding: np.ndarray) -> Optional[bool]:
+        """Nearest labelled example decision, None unless it is similar enough and clearly closer than the other label."""
+        vectors = self._get_example_vectors().get(check)
+        if not vectors:
+            return None
+        embedding = unit_rows(np.asarray(embedding, dtype=np.float32))
+        scores = {value: float(np.max(matrix @ embedding)) for value, matrix in vectors.items() if len(matrix)}
+        if len(scores) < 2:
+            return None
+        best, other = sorted(scores, key=scores.get, reverse=True)
+        if scores[best] >= self.threshold and scores[best] - scores[other] >= self.margin:
+            return best
+        return None
+
+    def _candidate(self, check: str, messages: str) -> Tuple[Optional[str], Optional[bool]]:
+        text = last_user_message(messages)
+        if text is None:
+            return None, None
+        text = self._normalize(text)
+        if not text or len(text) > self.max_message_chars:
+            return None, None
+        return text, self.match_rules(check, text)
+
+    def match(self, check: str, messages: str) -> Optional[bool]:
+        """
+        Decides a check locally from the serialized conversation.
+
+        Args:
+            check (str): "confirmation" or "change"
+            messages (str): Serialized conversation window, as sent to the LLM
+
+        Returns:
+            Optional[bool]: The decision, or None if the LLM has to decide
+        """
+        text, decision = self._candidate(check, messages)
+        if decision is not None:
+            record_decision(check, "rule", decision)
+            return decision
+        if text is not None and self.use_embeddings:
+            decision = self.match_embedding(check, embedding_service.embed_sync(text))
+            if decision is not None:
+                record_decision(check, "embedding", decision)
+                return decision
+        return None
+
+    async def match_async(self, check: str, messages: str) -> Optional[bool]:
+        """Same as match, with the embedding computed through the batching embedding service."""
+        text, decision = self._candidate(check, messages)
+        if decision is not None:
+            record_decision(check, "rule", decision)
+            return decision
+        if text is not None and self.use_embeddings:
+            embedding = await embedding_service.embed(text)
+            # Encoding the example phrases happens once, off the event loop
+            await asyncio.to_thread(self._get_example_vectors)
+            decision = self.match_embedding(check, embedding)
+            if decision is not None:
+                record_decision(check, "embedding", decision)
+                return decision
+        return None
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+_matcher_failed = False
+
+
+def get_intent_matcher() -> Optional[IntentMatcher]:
+    """Returns the shared matcher, None when the fast path is disabled or the rules can't be loaded."""
+    global _matcher, _matcher_failed
+    if not Config.INTENT_MATCHER_ENABLED or _matcher_failed:
+        return None
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None and not _matcher_failed:
+                try:
+                    _matcher = IntentMatcher(Config.INTENT_MATCHER_RULES_PATH, Config.INTENT_MATCHER_USE_EMBEDDINGS)
+                except (OSError, ValueError, re.error) as e:
+                    logger.error(f"Could not load intent rules, using the LLM only: {str(e)}", exc_info=True)
+                    _matcher_failed = True
+    return _matcher
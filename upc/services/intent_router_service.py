@@ -0,0 +1,63 @@
+from typing import Optional
+from models.response_models import IntentRoute
+from services.ai_client_service import get_async_openai_client
+from services.client_registry_service import ClientRegistry
+from utils.prompts import Prompts
+from upc.config import Config
+from upc.exceptions import InvalidModelError
+from upc.logger import setup_logger
+from upc.metric_logger import track_execution_time
+
+logger = setup_logger(__name__)
+
+
+@track_execution_time()
+async def route_intent_async(messages: str) -> Optional[IntentRoute]:
+    """
+    Classifies the conversation and checks confirmation, change intent and the
+    target field in a single structured LLM call.
+
+    Args:
+        messages (str): JSON serialized conversation messages
+
+    Returns:
+        Optional[IntentRoute]: The routing decision, or None if the call failed so
+        the caller can fall back to the legacy classifier chain
+    """
+    prompt = Prompts.COMBINED_INTENT_ROUTER.format(messages=messages)
+    provider = Config.INTENT_ROUTER_SELECTED_MODEL_CLIENT
+
+    try:
+        logger.info(f"Making combined intent routing call to {provider}")
+        if provider == "groq":
+            inst_client = ClientRegistry().get_instructor_client("groq", use_async=True)
+            route = await inst_client.chat.completions.create(
+                model=Config.INTENT_ROUTER_SELECTED_MODEL_GROQ,
+                messages=[
+                    {"role": "system", "content": "You are a precise assistant that routes conversations."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=200,
+                response_model=IntentRoute,
+            )
+        elif provider == "openai":
+            completion = await get_async_openai_client().beta.chat.completions.parse(
+                model=Config.INTENT_ROUTER_SELECTED_MODEL_OPENAI,
+                messages=[
+                    {"role": "system", "content": "You are a precise assistant that routes conversations."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format=IntentRoute,
+                temperature=0.1
+            )
+            route = completion.choices[0].message.parsed
+        else:
+            raise InvalidModelError(provider)
+
+        route.field_to_change = route.field_to_change.lower().replace(' ', '_') if route.change_requested else ""
+        logger.info(f"Intent route: {route.model_dump()}")
+        return route
+
+    except Exception as e:
+        logger.error(f"Error in combined intent routing: {str(e)}", exc_info=True)
+        return None
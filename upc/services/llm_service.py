@@ -11,6 +11,7 @@ from abc import ABC, abstractmethod
 import os
 from dotenv import load_dotenv
 from upc.logger import setup_logger
+from services.client_registry_service import ClientRegistry
 
 logger = setup_logger(__name__)
 
@@ -93,9 +94,10 @@ class BaseLLMProvider(ABC):
 
 class GroqProvider(BaseLLMProvider):
     def __init__(self, api_key: str, model_name: str):
-        self.client = groq.Groq(api_key=api_key)
+        # Pooled clients are shared through the registry with every other caller using this key
+        self.client = ClientRegistry().get_client("groq", api_key=api_key)
         self.model_name = model_name
-        self.instructor_client = instructor.patch(self.client)
+        self.instructor_client = ClientRegistry().get_instructor_client("groq", api_key=api_key)
 
     def generate_completion(
             self,
@@ -143,9 +145,10 @@ class GroqProvider(BaseLLMProvider):
 
 class OpenAIProvider(BaseLLMProvider):
     def __init__(self, api_key: str, model_name: str):
-        self.client = openai.OpenAI(api_key=api_key)
+        # Pooled clients are shared through the registry with every other caller using this key
+        self.client = ClientRegistry().get_client("openai", api_key=api_key)
         self.model_name = model_name
-        self.instructor_client = instructor.patch(self.client)
+        self.instructor_client = ClientRegistry().get_instructor_client("openai", api_key=api_key)
 
     def generate_completion(
             self,
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import threading
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+from services.ai_client_service import embedding_service, get_encoder
+from upc.config import Config
+from upc.logger import setup_logger
+from utils.classification_utils import unit_rows
+
+logger = setup_logger(__name__)
+
+PRODUCT_RELATED = "product_related"
+
+
+class LocalPrediction(NamedTuple):
+    label: str
+    similarity: float  # cosine similarity to the winning centroid
+    margin: float  # lead over the runner-up centroid
+    confident: bool
+
+
+def load_examples(path: str) -> List[Dict[str, str]]:
+    """Reads labelled examples, one {"text": ..., "label": ...} object per line."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class NearestCentroidClassifier:
+    """
+    Product/general classifier over sentence embeddings.
+
+    Each label is represented by the normalized mean embedding of its labelled
+    examples. A message is assigned the label of the most similar centroid and
+    counts as confident only when that similarity is at least min_similarity
+    and beats the runner-up by margin.
+    """
+
+    def __init__(self, min_similarity: float, margin: float):
+        self.min_similarity = min_similarity
+        self.margin = margin
+        self.labels: List[str] = []
+        self.centroids: Optional[np.ndarray] = None
+
+    def fit(self, texts: List[str], labels: List[str]) -> "NearestCentroidClassifier":
+        embeddings = unit_rows(np.asarray(get_encoder().encode(texts), dtype=np.float32))
+        self.labels = sorted(set(labels))
+        label_array = np.array(labels)
+        self.centroids = unit_rows(np.stack([embeddings[label_array == label].mean(axis=0) for label in self.labels]))
+        logger.info(f"Trained local classifier on {len(texts)} examples for labels {self.labels}")
+        return self
+
+    def predict(self, embedding: np.ndarray) -> LocalPrediction:
+        scores = self.centroids @ unit_rows(np.asarray(embedding, dtype=np.float32))
+        order = np.argsort(scores)[::-1]
+        best = float(scores[order[0]])
+        margin = best - float(scores[order[1]]) if len(order) > 1 else best
+        confident = best >= self.min_similarity and margin >= self.margin
+        return LocalPrediction(self.labels[order[0]], best, margin, confident)
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+_classifier_failed = False
+
+
+def get_local_classifier() -> Optional[NearestCentroidClassifier]:
+    """Trains the shared classifier from LOCAL_CLASSIFIER_EXAMPLES_PATH on first use, None if disabled or unavailable."""
+    global _classifier, _classifier_failed
+    if not Config.LOCAL_CLASSIFIER_ENABLED or _classifier_failed:
+        return None
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None and not _classifier_failed:
+                try:
+                    examples = load_examples(Config.LOCAL_CLASSIFIER_EXAMPLES_PATH)
+                    _classifier = NearestCentroidClassifier(
+                        Config.LOCAL_CLASSIFIER_MIN_SIMILARITY, Config.LOCAL_CLASSIFIER_MARGIN
+                    ).fit([e["text"] for e in examples], [e["label"] for e in examples])
+                except Exception as e:
+                    logger.error(f"Could not train local classifier, using the LLM only: {str(e)}", exc_info=True)
+                    _classifier_failed = True
+    return _classifier
+
+
+def classify_locally(text: str) -> Optional[LocalPrediction]:
+    classifier = get_local_classifier()
+    if classifier is None:
+        return None
+    return classifier.predict(embedding_service.embed_sync(text))
+
+
+async def classify_locally_async(text: str) -> Optional[LocalPrediction]:
+    """Same as classify_locally, training off the event loop and embedding through the batching service."""
+    classifier = await asyncio.to_thread(get_local_classifier)
+    if classifier is None:
+        return None
+    return classifier.predict(await embedding_service.embed(text))
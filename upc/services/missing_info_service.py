@@ -5,7 +5,9 @@ from upc.config import Config, ModelType
 from upc.exceptions import APICallError, JSONParseError
 from utils.prompts import Prompts
 from models.conversation_models import ConversationRequest
-from services.ai_client_service import make_api_call_greeting,make_api_call_missing
+from services.ai_client_service import make_api_call_greeting,make_api_call_missing,make_api_call_missing_async, TokenCallback
+from services.history_manager_service import history_manager, format_history
+from utils.conversation_context import summarize_request
 from upc.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -16,10 +18,9 @@ class MissingInfoAdapter:
 
     def generate_missing_info_prompt(self, conversation: ConversationRequest, missing_field: str) -> str:
         logger.debug(f"Generating missing info prompt for field: {missing_field}")
-        conversation_history = json.dumps([
-            {"role": "user" if msg.source == "ui" else "assistant", "content": msg.payload.text}
-            for msg in conversation.previousMessages
-        ], indent=2)
+        conversation_history = history_manager.serialize(
+            conversation.conversationId, format_history(conversation.previousMessages),
+            Config.HISTORY_MISSING_INFO_TOKEN_BUDGET)
         prompt = Prompts.MISSING_INFO_PROMPT.format(
             missing_field=missing_field,
             conversation_history=conversation_history
@@ -29,7 +30,7 @@ class MissingInfoAdapter:
 
     def process_request(self, request: ConversationRequest) -> str:
         try:
-            logger.info(f"missing info request : {request}")
+            logger.info(f"missing info request : {summarize_request(request)}")
             missing_field = request.currentMessage.payload.text
             logger.info(f"Processing missing info request for field: {missing_field}")
             prompt = self.generate_missing_info_prompt(request, missing_field)
@@ -42,4 +43,20 @@ class MissingInfoAdapter:
             raise HTTPException(status_code=400, detail=f"Missing key in request data: {str(e)}")
         except json.JSONDecodeError:
             logger.error("Failed to parse JSON response")
-            raise JSONParseError()
\ No newline at end of file
+            raise JSONParseError()
+
+    async def process_request_async(self, request: ConversationRequest, on_token: TokenCallback = None) -> str:
+        try:
+            logger.info(f"missing info request : {summarize_request(request)}")
+            missing_field = request.currentMessage.payload.text
+            logger.info(f"Processing missing info request for field: {missing_field}")
+            prompt = self.generate_missing_info_prompt(request, missing_field)
+            response = await make_api_call_missing_async(prompt, on_token)
+            logger.debug(f"Missing info response: {response.strip()}")
+            return response.strip()
+        except KeyError as e:
+            logger.error(f"Missing key in request data: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Missing key in request data: {str(e)}")
+        except json.JSONDecodeError:
+            logger.error("Failed to parse JSON response")
+            raise JSONParseError()
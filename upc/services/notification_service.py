@@ -1,5 +1,12 @@
+import asyncio
+from contextlib import asynccontextmanager
+import httpx
 import requests
 from typing import Optional
+from upc.config import Config
+from upc.logger import setup_logger
+
+logger = setup_logger(__name__)
 
 
 def notify_image_processing(conversation_id: str, notification_message: str = "processing image..") -> Optional[
@@ -14,7 +21,7 @@ def notify_image_processing(conversation_id: str, notification_message: str = "p
     Returns:
     Optional[requests.Response]: The response from the external service if successful, None otherwise.
     """
-    notification_url = "http://10.0.13.74:8099/BPE/api/v1/message/notification"
+    notification_url = Config.NOTIFICATION_URL
     notification_params = {
         "notification": notification_message,
         "conversationId": conversation_id
@@ -27,4 +34,79 @@ def notify_image_processing(conversation_id: str, notification_message: str = "p
         return response
     except requests.exceptions.RequestException as e:
         print(f"Failed to send notification: {e}")
-        return None
\ No newline at end of file
+        return None
+
+PROGRESS_MESSAGES = [
+    "Processing your image...",
+    "This might take a few more seconds...",
+    "Almost there! Thanks for your patience.",
+    "Just a bit longer...",
+    "Finalizing the image processing..."
+]
+
+
+class NotificationDispatcher:
+    """
+    Sends image processing notifications from the event loop over one pooled
+    HTTP client, with a timeout on every request.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=Config.NOTIFICATION_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=Config.NOTIFICATION_MAX_CONNECTIONS)
+            )
+        return self._client
+
+    async def notify(self, conversation_id: str, notification_message: str = "processing image..") -> bool:
+        """
+        Notify the external service, returns True if the notification was accepted.
+        Failures and timeouts are logged and never raised.
+        """
+        try:
+            response = await self._get_client().post(
+                Config.NOTIFICATION_URL,
+                params={"notification": notification_message, "conversationId": conversation_id}
+            )
+            response.raise_for_status()
+            logger.debug(f"Notification sent for {conversation_id}: {notification_message}")
+            return True
+        except Exception as e:
+            # Not only httpx.HTTPError, a bad NOTIFICATION_URL raises httpx.InvalidURL.
+            # CancelledError is a BaseException and still stops the progress task
+            logger.warning(f"Failed to send notification for {conversation_id}: {e!r}")
+            return False
+
+    async def _send_progress(self, conversation_id: str) -> None:
+        await self.notify(conversation_id)
+        message_index = 0
+        while True:
+            await self.notify(conversation_id, PROGRESS_MESSAGES[message_index])
+            message_index = (message_index + 1) % len(PROGRESS_MESSAGES)
+            await asyncio.sleep(Config.NOTIFICATION_INTERVAL_SECONDS)
+
+    @asynccontextmanager
+    async def progress(self, conversation_id: str):
+        """
+        Sends progress notifications in a background task for as long as the
+        block runs, the task is cancelled as soon as the block exits.
+        """
+        task = asyncio.create_task(self._send_progress(conversation_id))
+        try:
+            yield
+        finally:
+            task.cancel()
+            # wait() doesn't raise the task's own CancelledError, a cancellation of the caller still propagates
+            await asyncio.wait([task])
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -1,24 +1,33 @@
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from models.conversation_models import Message
-from models.product_models import ProductMessage
+from models.product_models import ProductMessage, ProductPatch
 from models.response_models import ConformationMessage
-from services.ai_client_service import make_api_call_greeting, client,make_api_call_final_message
-import groq
+from services.ai_client_service import make_api_call_greeting, make_api_call_final_message
 from utils.prompts import Prompts
+from utils.prompt_builder import compile_prompt
 from upc.exceptions import JSONParseError
 from upc.config import Config, ModelType
-import instructor
+from services.client_registry_service import ClientRegistry
+from services.intent_matcher_service import get_intent_matcher, record_decision
 from upc.logger import setup_logger
-import  os
 logger = setup_logger(__name__)
-from services.ai_client_service import open_ai_client
-inst_client = instructor.from_groq(client, mode=instructor.Mode.TOOLS)
-client_small =  groq.Groq(api_key=os.getenv("GROQ_API_KEY"))
-inst_client_small = instructor.from_groq(client_small, mode=instructor.Mode.TOOLS)
+from services.ai_client_service import get_openai_client, get_async_openai_client, make_api_call_final_message_async, make_api_call_structured_async, TokenCallback
 from upc.metric_logger import track_execution_time
 from pydantic import BaseModel, Field
 
+
+EXTRACTION_SYSTEM_PROMPT = "You are a helpful assistant that extracts information and formats it as JSON."
+
+
+def get_inst_client():
+    return ClientRegistry().get_instructor_client("groq")
+
+
+def get_async_inst_client():
+    return ClientRegistry().get_instructor_client("groq", use_async=True)
+
+
 class FieldNameResponse(BaseModel):
     field_name: str = Field(default="")
 
@@ -45,7 +54,7 @@ def extract_field(messages: str) -> str:
         If no clear field is mentioned, return an empty string.
         """
         
-        resp = inst_client.chat.completions.create(
+        resp = get_inst_client().chat.completions.create(
             model="llama3-70b-8192",
             messages=[
                 {"role": "system", "content": "You are a precise assistant that extracts field names."},
@@ -65,10 +74,15 @@ def extract_field(messages: str) -> str:
         return ""
 
 def check_change_confirmation(messages: str) -> bool:
+    matcher = get_intent_matcher()
+    decision = matcher.match("change", messages) if matcher is not None else None
+    if decision is not None:
+        logger.info(f"Change confirmation decided locally: {decision}")
+        return decision
     prompt = Prompts.CHANGE_CONFIRMATION_CHECKER.format(message=messages, value="{'value':'true/false'}")
     logger.info("The prompt for change confirmation")
     logger.info(prompt)
-    resp = inst_client.chat.completions.create(
+    resp = get_inst_client().chat.completions.create(
         model="llama3-70b-8192",
         messages=[
             {"role": "system", "content": "You are a helpful assistant"},
@@ -80,6 +94,7 @@ def check_change_confirmation(messages: str) -> bool:
     resp.model_dump()
     val = resp.model_dump().get("value")
     logger.info(f"The value got for change confirmation is {val}")
+    record_decision("change", "llm", val.lower() == 'true')
     return val.lower() == 'true'
 
 
@@ -93,6 +108,11 @@ def check_confirmation(messages: str) -> bool:
     Returns:
         bool: True if user confirmed, False otherwise
     """
+    matcher = get_intent_matcher()
+    decision = matcher.match("confirmation", messages) if matcher is not None else None
+    if decision is not None:
+        logger.info(f"Confirmation decided locally: {decision}")
+        return decision
     prompt = Prompts.CONFIRMATION_MESSAGE_CHECKER.format(
         message=messages,
         value="{'value':'true/false'}"
@@ -102,8 +122,7 @@ def check_confirmation(messages: str) -> bool:
 
     try:
         if Config.CONFIRMATION_SELECTED_MODEL_CLIENT == "groq":
-            inst_client = instructor.from_groq(client, mode=instructor.Mode.TOOLS)
-            resp = inst_client.chat.completions.create(
+            resp = get_inst_client().chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant"},
@@ -115,7 +134,7 @@ def check_confirmation(messages: str) -> bool:
             val = resp.model_dump().get("value")
 
         elif Config.CONFIRMATION_SELECTED_MODEL_CLIENT == "openai":
-            completion = open_ai_client.beta.chat.completions.parse(
+            completion = get_openai_client().beta.chat.completions.parse(
                 model=Config.CONFIRMATION_SELECTED_MODEL_OPENAI,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant"},
@@ -131,6 +150,7 @@ def check_confirmation(messages: str) -> bool:
             val = json.loads(json_response).get("value")
 
         logger.info(f"The value got for confirmation message is {val}")
+        record_decision("confirmation", "llm", val.lower() == 'true')
         return val.lower() == 'true'
 
     except Exception as e:
@@ -189,8 +209,7 @@ def extract_plan(messages: List[Message], product_schema: Dict[str, Any]) -> Dic
     for _ in range(max_retries):
         try:
             if Config.PLAN_EXTRACTOR_SELECTED_MODEL_CLIENT == ModelType.GROQ:
-                inst_client = instructor.from_groq(client, mode=instructor.Mode.TOOLS)
-                resp = inst_client.chat.completions.create(
+                resp = get_inst_client().chat.completions.create(
                     model="llama-3.3-70b-versatile",
                     messages=[
                         {"role": "system",
@@ -203,7 +222,7 @@ def extract_plan(messages: List[Message], product_schema: Dict[str, Any]) -> Dic
                 extracted_data = resp.model_dump()
 
             elif Config.PLAN_EXTRACTOR_SELECTED_MODEL_CLIENT == "openai":
-                completion = open_ai_client.beta.chat.completions.parse(
+                completion = get_openai_client().beta.chat.completions.parse(
                     model=Config.PLAN_EXTRACTOR_SELECTED_MODEL_OPENAI,
                     messages=[
                         {"role": "system",
@@ -225,20 +244,7 @@ def extract_plan(messages: List[Message], product_schema: Dict[str, Any]) -> Dic
                 continue
 
             # Fill in missing or empty values from product_schema
-            filled_data = {}
-            for key, default_value in product_schema.items():
-                extracted_value = extracted_data.get(key)
-
-                if extracted_value == "":  # Only check for empty string
-                    # Use default only if the extracted value is an empty string
-                    filled_data[key] = default_value if default_value else ""
-                    logger.debug(f"Using default value for {key}: {default_value}")
-                else:
-                    # Retain None or any valid non-empty extracted value
-                    filled_data[key] = extracted_value
-                    logger.debug(f"Using extracted value for {key}: {extracted_value}")
-
-            return filled_data
+            return _fill_plan_defaults(extracted_data, product_schema)
 
         except Exception as e:
             logger.error(f"Error in extract_plan attempt {_ + 1}: {str(e)}", exc_info=True)
@@ -249,6 +255,293 @@ def extract_plan(messages: List[Message], product_schema: Dict[str, Any]) -> Dic
     raise JSONParseError()
 
 
+def _fill_plan_defaults(extracted_data: Dict[str, Any], product_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in missing or empty extracted values from product_schema."""
+    filled_data = {}
+    for key, default_value in product_schema.items():
+        extracted_value = extracted_data.get(key)
+
+        if extracted_value == "":  # Only check for empty string
+            # Use default only if the extracted value is an empty string
+            filled_data[key] = default_value if default_value else ""
+            logger.debug(f"Using default value for {key}: {default_value}")
+        else:
+            # Retain None or any valid non-empty extracted value
+            filled_data[key] = extracted_value
+            logger.debug(f"Using extracted value for {key}: {extracted_value}")
+    return filled_data
+
+
+async def extract_field_async(messages: str) -> str:
+    """
+    Async counterpart of extract_field.
+
+    Args:
+        messages (str): Conversation messages
+
+    Returns:
+        str: The name of the field to be changed
+    """
+    try:
+        if isinstance(messages, list):
+            messages = json.dumps(messages)
+
+        prompt = f"""
+        Based on the following conversation, identify the specific field the user wants to change:
+        {messages}
+        Respond ONLY with the field name. 
+        If no clear field is mentioned, return an empty string.
+        """
+
+        resp = await get_async_inst_client().chat.completions.create(
+            model="llama3-70b-8192",
+            messages=[
+                {"role": "system", "content": "You are a precise assistant that extracts field names."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=1000,
+            response_model=FieldNameResponse
+        )
+
+        field_name = resp.field_name.lower().replace(' ', '_') if resp.field_name else ""
+
+        logger.info(f"Extracted field name: {field_name}")
+        return field_name
+    except Exception as e:
+        logger.error(f"Error in field extraction: {str(e)}")
+        return ""
+
+
+async def check_change_confirmation_async(messages: str) -> bool:
+    matcher = get_intent_matcher()
+    decision = await matcher.match_async("change", messages) if matcher is not None else None
+    if decision is not None:
+        logger.info(f"Change confirmation decided locally: {decision}")
+        return decision
+    prompt = Prompts.CHANGE_CONFIRMATION_CHECKER.format(message=messages, value="{'value':'true/false'}")
+    logger.info("The prompt for change confirmation")
+    logger.info(prompt)
+    resp = await get_async_inst_client().chat.completions.create(
+        model="llama3-70b-8192",
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant"},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=1000,
+        response_model=ConformationMessage,
+    )
+    val = resp.model_dump().get("value")
+    logger.info(f"The value got for change confirmation is {val}")
+    record_decision("change", "llm", val.lower() == 'true')
+    return val.lower() == 'true'
+
+
+async def check_confirmation_async(messages: str) -> bool:
+    """
+    Async counterpart of check_confirmation.
+
+    Args:
+        messages: String containing conversation messages
+
+    Returns:
+        bool: True if user confirmed, False otherwise
+    """
+    matcher = get_intent_matcher()
+    decision = await matcher.match_async("confirmation", messages) if matcher is not None else None
+    if decision is not None:
+        logger.info(f"Confirmation decided locally: {decision}")
+        return decision
+    prompt = Prompts.CONFIRMATION_MESSAGE_CHECKER.format(
+        message=messages,
+        value="{'value':'true/false'}"
+    )
+    logger.info("The prompt for confirmation")
+    logger.info(prompt)
+
+    try:
+        if Config.CONFIRMATION_SELECTED_MODEL_CLIENT == "groq":
+            resp = await get_async_inst_client().chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant"},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=1000,
+                response_model=ConformationMessage,
+            )
+            val = resp.model_dump().get("value")
+
+        elif Config.CONFIRMATION_SELECTED_MODEL_CLIENT == "openai":
+            completion = await get_async_openai_client().beta.chat.completions.parse(
+                model=Config.CONFIRMATION_SELECTED_MODEL_OPENAI,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant"},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format=ConformationMessage,
+                temperature=0.1
+            )
+            val = completion.choices[0].message.parsed.value
+
+        else:
+            json_response = await make_api_call_structured_async(prompt)
+            val = json.loads(json_response).get("value")
+
+        logger.info(f"The value got for confirmation message is {val}")
+        record_decision("confirmation", "llm", val.lower() == 'true')
+        return val.lower() == 'true'
+
+    except Exception as e:
+        logger.error(f"Error in check_confirmation: {str(e)}", exc_info=True)
+        return False
+
+
+async def form_final_message_async(extracted_plan: Dict[str, Any], on_token: TokenCallback = None) -> str:
+    compiled = compile_prompt(Prompts.FINAL_MESSAGE_TEMPLATE, EXTRACTION_SYSTEM_PROMPT)
+    schema = json.dumps(extracted_plan, indent=2)
+    # The rendered prompt stays the cache key, the provider gets the prefix-cacheable layout
+    response = await make_api_call_final_message_async(
+        compiled.render(schema=schema), on_token, messages=compiled.messages(schema=schema))
+    return response.strip()
+
+
+@track_execution_time()
+async def extract_plan_async(messages: Union[List[Message], str], product_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async counterpart of extract_plan.
+
+    Args:
+        messages: List of Message objects containing conversation, or the
+            conversation already serialized by the request context
+        product_schema: Dictionary containing product field defaults
+
+    Returns:
+        Dictionary containing extracted and processed product information
+    """
+    if not isinstance(messages, str):
+        messages = json.dumps([{"role": msg.role, "content": msg.content} for msg in messages],
+                              separators=(",", ":"), ensure_ascii=False)
+
+    # Static instructions first and the conversation and schema last, so providers can cache the prefix
+    compiled = compile_prompt(Prompts.PRODUCT_INFO_EXTRACTION, EXTRACTION_SYSTEM_PROMPT)
+    values = {
+        "messages": messages,
+        "product_schema": json.dumps(product_schema, separators=(",", ":"), ensure_ascii=False)
+    }
+    prompt_messages = compiled.messages(**values)
+
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            if Config.PLAN_EXTRACTOR_SELECTED_MODEL_CLIENT == ModelType.GROQ.value:
+                resp = await get_async_inst_client().chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    messages=prompt_messages,
+                    max_tokens=1000,
+                    response_model=ProductMessage,
+                )
+                extracted_data = resp.model_dump()
+
+            elif Config.PLAN_EXTRACTOR_SELECTED_MODEL_CLIENT == ModelType.OPENAI.value:
+                completion = await get_async_openai_client().beta.chat.completions.parse(
+                    model=Config.PLAN_EXTRACTOR_SELECTED_MODEL_OPENAI,
+                    messages=prompt_messages,
+                    response_format=ProductMessage,
+                    temperature=0.1
+                )
+                extracted_data = completion.choices[0].message.parsed.model_dump()
+
+            else:
+                json_response = await make_api_call_structured_async(compiled.render(**values))
+                extracted_data = json.loads(json_response)
+
+            if extracted_data is None:
+                logger.error("Failed to extract data from model response")
+                continue
+
+            return _fill_plan_defaults(extracted_data, product_schema)
+
+        except Exception as e:
+            logger.error(f"Error in extract_plan_async attempt {attempt + 1}: {str(e)}", exc_info=True)
+            if attempt == max_retries - 1:  # Last retry
+                raise JSONParseError()
+            continue
+
+    raise JSONParseError()
+
+
+def _apply_plan_patch(patch: ProductPatch, current_plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge a field patch into a copy of the current plan."""
+    merged_plan = dict(current_plan)
+    for key, value in patch.model_dump(exclude={"cleared_fields"}).items():
+        if key in merged_plan and value not in (None, ""):
+            merged_plan[key] = value
+            logger.debug(f"Patched value for {key}: {value}")
+    for key in patch.cleared_fields:
+        key = key.lower().replace(' ', '_')
+        if key in merged_plan:
+            merged_plan[key] = None
+            logger.debug(f"Cleared value for {key}")
+    return merged_plan
+
+
+@track_execution_time()
+async def extract_plan_delta_async(latest_message: str, current_plan: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Incrementally updates a previously extracted plan from the latest user message.
+
+    Only the current plan and the newest message are sent, the model returns the
+    changed fields which are merged locally.
+
+    Args:
+        latest_message: Text of the newest user message
+        current_plan: Plan extracted on the previous turn
+
+    Returns:
+        Dictionary containing the merged product information
+    """
+    prompt = Prompts.PRODUCT_INFO_PATCH.format(
+        current_plan=json.dumps(current_plan, separators=(",", ":")),
+        latest_message=latest_message
+    )
+
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            if Config.PLAN_EXTRACTOR_SELECTED_MODEL_CLIENT == ModelType.OPENAI.value:
+                completion = await get_async_openai_client().beta.chat.completions.parse(
+                    model=Config.PLAN_EXTRACTOR_SELECTED_MODEL_OPENAI,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant that updates product plans."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format=ProductPatch,
+                    temperature=0.1
+                )
+                patch = completion.choices[0].message.parsed
+            else:
+                patch = await get_async_inst_client().chat.completions.create(
+                    model="llama-3.3-70b-versatile",
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant that updates product plans."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=300,
+                    response_model=ProductPatch,
+                )
+
+            logger.debug(f"Plan patch: {patch.model_dump()}")
+            return _apply_plan_patch(patch, current_plan)
+
+        except Exception as e:
+            logger.error(f"Error in extract_plan_delta_async attempt {attempt + 1}: {str(e)}", exc_info=True)
+            if attempt == max_retries - 1:  # Last retry
+                raise JSONParseError()
+            continue
+
+    raise JSONParseError()
+
+
 def extract_plan1(messages: List[Message], product_schema: Dict[str, Any]) -> Dict[str, Any]:
     formatted_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
     prompt = Prompts.PRODUCT_INFO_EXTRACTION.format(
@@ -260,8 +553,7 @@ def extract_plan1(messages: List[Message], product_schema: Dict[str, Any]) -> Di
     for _ in range(max_retries):
         try:
             if Config.SELECTED_MODEL == ModelType.GROQ:
-                inst_client = instructor.from_groq(client, mode=instructor.Mode.TOOLS)
-                resp = inst_client.chat.completions.create(
+                resp = get_inst_client().chat.completions.create(
                     model="llama3-70b-8192",
                     messages=[
                         {"role": "system",
@@ -0,0 +1,313 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+import faiss
+import numpy as np
+from upc.config import Config
+from upc.logger import setup_logger
+from upc.metric_logger import MetricLogger
+
+logger = setup_logger(__name__)
+
+
+class SemanticCache:
+    """
+    Size-bounded response cache looked up by embedding similarity.
+
+    Lookups first try an exact match on a hash of the normalized prompt, which
+    needs no encoding, and only then fall back to the embedding index.
+
+    Entries are evicted least recently used once max_entries is reached and
+    expire after ttl_seconds. The index starts as an exact flat inner product
+    search and is rebuilt as an IVF index once it grows past ann_threshold.
+    The index, vectors and values are persisted under persist_dir so a restart
+    loads them instead of re-encoding anything. The vectors are memory-mapped,
+    the faiss index is read into memory.
+
+    With quantization set to "fp16" or "int8" the index stores scalar quantized
+    codes and the raw vectors are kept as float16, cutting memory 2-4x.
+    """
+
+    def __init__(self, namespace: str, embed: Callable[[str], np.ndarray], dimension: int,
+                 max_entries: int, ttl_seconds: int, ann_threshold: int, persist_dir: Optional[str] = None,
+                 embed_async: Optional[Callable[[str], Awaitable[np.ndarray]]] = None, quantization: str = "none"):
+        self.namespace = namespace
+        self.embed = embed
+        self.embed_async = embed_async
+        self.quantization = quantization
+        self._vector_dtype = np.float32 if quantization == "none" else np.float16
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.ann_threshold = ann_threshold
+        self.persist_dir = persist_dir
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()  # id -> {"value", "created_at"}, LRU order
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._exact: Dict[str, int] = {}  # normalized prompt hash -> id
+        # Per tier counters, "misses" counts lookups that missed in every tier
+        self.stats = {"exact_hits": 0, "exact_misses": 0, "semantic_hits": 0, "semantic_misses": 0, "misses": 0}
+        self._next_id = 0
+        self._dirty_writes = 0
+        self._lock = threading.RLock()
+        # Serializes saves, which write their files outside _lock
+        self._save_lock = threading.Lock()
+        self._quantizer = None
+        self._index = self._new_flat_index()
+        if persist_dir:
+            self._load()
+
+    def _root(self) -> str:
+        # Every save is a complete version directory, CURRENT names the live one
+        return os.path.join(self.persist_dir, self.namespace)
+
+    def _paths(self, version: str):
+        base = os.path.join(self._root(), version)
+        return os.path.join(base, "index"), os.path.join(base, "vectors.npy"), os.path.join(base, "meta.json")
+
+    def _scalar_quantizer_type(self):
+        if self.quantization == "fp16":
+            return faiss.ScalarQuantizer.QT_fp16
+        if self.quantization == "int8":
+            return faiss.ScalarQuantizer.QT_8bit_uniform
+        raise ValueError(f"Unsupported embedding quantization: {self.quantization}")
+
+    def _new_flat_index(self):
+        if self.quantization == "none":
+            return faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+        index = faiss.IndexScalarQuantizer(self.dimension, self._scalar_quantizer_type(), faiss.METRIC_INNER_PRODUCT)
+        # Normalized embeddings lie in [-1, 1], training on those bounds fixes the uniform int8 range
+        index.train(np.stack([-np.ones(self.dimension), np.ones(self.dimension)]).astype(np.float32))
+        return faiss.IndexIDMap2(index)
+
+    def _rebuild_index(self) -> None:
+        ids = np.array(list(self._vectors.keys()), dtype=np.int64)
+        vectors = np.array([self._vectors[i] for i in ids], dtype=np.float32).reshape(-1, self.dimension)
+        if len(ids) > self.ann_threshold:
+            nlist = min(Config.SEMANTIC_CACHE_NLIST, len(ids))
+            self._quantizer = faiss.IndexFlatIP(self.dimension)
+            if self.quantization == "none":
+                index = faiss.IndexIVFFlat(self._quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexIVFScalarQuantizer(
+                    self._quantizer, self.dimension, nlist, self._scalar_quantizer_type(), faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.nprobe = Config.SEMANTIC_CACHE_NPROBE
+            logger.info(f"Rebuilt {self.namespace} cache as IVF index with {len(ids)} entries")
+        else:
+            self._quantizer = None
+            index = self._new_flat_index()
+        if len(ids):
+            index.add_with_ids(vectors, ids)
+        self._index = index
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is not None and self._exact.get(entry["key"]) == entry_id:
+            del self._exact[entry["key"]]
+        self._vectors.pop(entry_id, None)
+        self._index.remove_ids(np.array([entry_id], dtype=np.int64))
+
+    def _is_expired(self, entry: dict) -> bool:
+        return time.time() - entry["created_at"] > self.ttl_seconds
+
+    def _hit_rate(self, tier: str) -> float:
+        total = self.stats[f"{tier}_hits"] + self.stats[f"{tier}_misses"]
+        return round(self.stats[f"{tier}_hits"] / total, 4) if total else 0.0
+
+    def _record(self, tier: str, hit: bool, final: bool = True) -> None:
+        """Counts a tier outcome, final is False for an exact miss that falls through to the semantic tier."""
+        self.stats[f"{tier}_hits" if hit else f"{tier}_misses"] += 1
+        if not final:
+            return
+        if not hit:
+            self.stats["misses"] += 1
+        MetricLogger().log_event(
+            "semantic_cache_lookup",
+            additional_data={"cache": self.namespace, "tier": tier if hit else "miss", **self.stats,
+                             "exact_hit_rate": self._hit_rate("exact"),
+                             "semantic_hit_rate": self._hit_rate("semantic")}
+        )
+
+    def _get_live(self, entry_id: Optional[int]) -> Optional[str]:
+        entry = self._entries.get(entry_id) if entry_id is not None else None
+        if entry is None:
+            return None
+        if self._is_expired(entry):
+            self._remove(entry_id)
+            return None
+        self._entries.move_to_end(entry_id)
+        return entry["value"]
+
+    def _lookup_exact(self, text: str) -> Optional[str]:
+        """Exact match tier, returns the value or None. Only an empty cache makes the miss final."""
+        with self._lock:
+            value = self._get_live(self._exact.get(prompt_hash(text)))
+            self._record("exact", value is not None, final=value is not None or not self._entries)
+            return value
+
+    def _lookup_semantic(self, embedding: np.ndarray, threshold: float) -> Optional[str]:
+        embedding = normalize_embedding(embedding).astype(np.float32)
+        with self._lock:
+            distances, indices = self._index.search(np.array([embedding]), 1)
+            entry_id = int(indices[0][0])
+            value = None
+            if entry_id != -1 and distances[0][0] > threshold:
+                value = self._get_live(entry_id)
+            self._record("semantic", value is not None)
+            return value
+
+    def lookup(self, text: str, threshold: float) -> Optional[str]:
+        """Returns the cached value for the same or most similar prompt above threshold, if any."""
+        value = self._lookup_exact(text)
+        if value is not None or not self._entries:
+            return value
+        return self._lookup_semantic(self.embed(text), threshold)
+
+    async def lookup_async(self, text: str, threshold: float) -> Optional[str]:
+        """
+        Same as lookup, but encodes through embed_async and searches on a worker
+        thread, so the event loop never waits on the lock held by an insert.
+        """
+        value = await asyncio.to_thread(self._lookup_exact, text)
+        if value is not None or not self._entries:
+            return value
+        embedding = await self.embed_async(text)
+        return await asyncio.to_thread(self._lookup_semantic, embedding, threshold)
+
+    def add(self, text: str, value: str) -> None:
+        """Adds a prompt and its response, evicting expired and least recently used entries."""
+        self._insert(text, value, self.embed(text))
+
+    async def add_async(self, text: str, value: str) -> None:
+        """Same as add, with index maintenance and persistence run off the event loop."""
+        embedding = await self.embed_async(text)
+        await asyncio.to_thread(self._insert, text, value, embedding)
+
+    def _insert(self, text: str, value: str, embedding: np.ndarray) -> None:
+        embedding = normalize_embedding(embedding).astype(np.float32)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            key = prompt_hash(text)
+            self._entries[entry_id] = {"key": key, "value": value, "created_at": time.time()}
+            self._vectors[entry_id] = embedding.astype(self._vector_dtype)
+            self._exact[key] = entry_id
+
+            expired = [i for i, entry in self._entries.items() if self._is_expired(entry)]
+            for i in expired:
+                self._remove(i)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+            if self._quantizer is None and len(self._entries) > self.ann_threshold:
+                self._rebuild_index()
+            else:
+                self._index.add_with_ids(np.array([embedding]), np.array([entry_id], dtype=np.int64))
+
+            self._dirty_writes += 1
+            save_due = self.persist_dir and self._dirty_writes >= Config.SEMANTIC_CACHE_PERSIST_EVERY
+            logger.debug(f"Added to {self.namespace} cache. Current size: {len(self._entries)}")
+        if save_due:
+            self.save()
+
+    def save(self) -> None:
+        """
+        Writes the index, vectors and values to a new version directory and then
+        atomically points CURRENT at it, so a crash never leaves a mismatched set.
+        """
+        if not self.persist_dir:
+            return
+        with self._save_lock:
+            # Snapshot under the lock, the file writes below don't hold up lookups and inserts
+            with self._lock:
+                version = f"{time.time_ns()}-{self._next_id}"
+                ids, vectors, metadata, index_data = self._snapshot()
+                self._dirty_writes = 0
+            index_path, vectors_path, meta_path = self._paths(version)
+            os.makedirs(os.path.dirname(index_path))
+            with open(index_path, "wb") as f:
+                f.write(index_data.tobytes())
+            with open(vectors_path, "wb") as f:
+                np.save(f, vectors)
+            with open(meta_path, "w") as f:
+                json.dump(metadata, f)
+            self._publish(version)
+            logger.info(f"Persisted {self.namespace} cache with {len(ids)} entries")
+
+    def _snapshot(self):
+        ids = list(self._entries.keys())
+        vectors = np.array([self._vectors[i] for i in ids], dtype=self._vector_dtype).reshape(-1, self.dimension)
+        metadata = {
+            "next_id": self._next_id,
+            "entries": [
+                [i, self._entries[i]["key"], self._entries[i]["value"], self._entries[i]["created_at"]]
+                for i in ids
+            ]
+        }
+        return ids, vectors, metadata, faiss.serialize_index(self._index)
+
+    def _publish(self, version: str) -> None:
+        current_path = os.path.join(self._root(), "CURRENT")
+        with open(current_path + ".tmp", "w") as f:
+            f.write(version)
+        os.replace(current_path + ".tmp", current_path)
+        # Keep the previous version too, the loaded vectors may still be memory-mapped from it
+        versions = sorted(name for name in os.listdir(self._root()) if name != version and not name.startswith("CURRENT"))
+        for old in versions[:-1]:
+            shutil.rmtree(os.path.join(self._root(), old), ignore_errors=True)
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self._root(), "CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> None:
+        version = self._current_version()
+        if version is None:
+            return
+        index_path, vectors_path, meta_path = self._paths(version)
+        try:
+            with open(meta_path) as f:
+                metadata = json.load(f)
+            vectors = np.load(vectors_path, mmap_mode="r")
+            for row, (entry_id, key, value, created_at) in enumerate(metadata["entries"]):
+                self._entries[entry_id] = {"key": key, "value": value, "created_at": created_at}
+                self._vectors[entry_id] = vectors[row]
+                self._exact[key] = entry_id
+            self._next_id = metadata["next_id"]
+            self._index = faiss.read_index(index_path)
+            if hasattr(self._index, "nprobe"):
+                self._index.nprobe = Config.SEMANTIC_CACHE_NPROBE
+                # Rebuilding as IVF is only triggered while no quantizer is set
+                self._quantizer = self._index.quantizer
+            logger.info(f"Loaded {self.namespace} cache with {len(self._entries)} entries")
+        except Exception as e:
+            logger.error(f"Failed to load {self.namespace} cache, starting empty: {str(e)}", exc_info=True)
+            self._entries.clear()
+            self._vectors.clear()
+            self._exact.clear()
+            self._next_id = 0
+            self._index = self._new_flat_index()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def prompt_hash(text: str) -> str:
+    """Hash of the prompt with whitespace collapsed, used for the exact match tier."""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def normalize_embedding(embedding):
+    norm = np.linalg.norm(embedding)
+    return embedding / norm if norm > 0 else embedding
@@ -0,0 +1,136 @@
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from upc.config import Config
+from upc.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class BaseStateStore(ABC):
+    """Abstract base class for per-conversation state backends"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class InMemoryStateStore(BaseStateStore):
+    """
+    In-process store with LRU eviction, a per-entry TTL and a cap on the total
+    serialized size of all entries.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, payload)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _evict(self) -> None:
+        now = time.time()
+        expired = [key for key, (expires_at, _, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            logger.debug(f"Evicting conversation state for {key}")
+            self._remove(key)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, payload = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            # Hand out a fresh copy so callers can mutate it freely
+            return json.loads(payload)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        payload = json.dumps(value, separators=(",", ":"))
+        size = len(payload)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + self.ttl_seconds, size, payload)
+            self._total_bytes += size
+            self._evict()
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+
+class RedisStateStore(BaseStateStore):
+    """
+    Store backed by any Redis-compatible server (Redis, Valkey, KeyDB, ...).
+    Expiry is delegated to the server, LRU eviction and the memory cap to its
+    maxmemory / maxmemory-policy settings.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int, key_prefix: str = "upc:state:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("The redis package is required for STATE_STORE_BACKEND=redis") from e
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = await self.client.get(self.key_prefix + key)
+        return json.loads(payload) if payload is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        payload = json.dumps(value, separators=(",", ":"))
+        await self.client.set(self.key_prefix + key, payload, ex=self.ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.key_prefix + key)
+
+
+_state_store: Optional[BaseStateStore] = None
+
+
+def get_state_store() -> BaseStateStore:
+    """Returns the process wide conversation state store for the configured backend"""
+    global _state_store
+    if _state_store is None:
+        backend = Config.STATE_STORE_BACKEND
+        logger.info(f"Initializing {backend} conversation state store")
+        if backend == "memory":
+            _state_store = InMemoryStateStore(
+                ttl_seconds=Config.STATE_STORE_TTL_SECONDS,
+                max_entries=Config.STATE_STORE_MAX_ENTRIES,
+                max_bytes=Config.STATE_STORE_MAX_BYTES
+            )
+        elif backend == "redis":
+            _state_store = RedisStateStore(
+                url=Config.STATE_STORE_REDIS_URL,
+                ttl_seconds=Config.STATE_STORE_TTL_SECONDS
+            )
+        else:
+            raise ValueError(f"Unsupported state store backend: {backend}")
+    return _state_store
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Same import roots as the app: "services.x" from upc/, "upc.config" from the repository root
+UPC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [UPC_DIR, os.path.dirname(UPC_DIR)]
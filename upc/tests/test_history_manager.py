@@ -0,0 +1,44 @@
+from services.history_manager_service import MESSAGE_TOKEN_OVERHEAD, HistoryManager, count_tokens
+
+
+def conversation(count):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message number {i}"} for i in range(count)]
+
+
+def test_everything_is_kept_within_budget():
+    messages = conversation(4)
+    assert HistoryManager(10).window("c", messages, token_budget=10_000) == messages
+
+
+def test_oldest_messages_are_dropped_first():
+    messages = conversation(6)
+    per_message = count_tokens(messages[0]["content"]) + MESSAGE_TOKEN_OVERHEAD
+    selected = HistoryManager(10).window("c", messages, token_budget=per_message * 3)
+    assert selected == messages[-3:]
+
+
+def test_max_messages_limits_the_window():
+    messages = conversation(6)
+    assert HistoryManager(10).window("c", messages, token_budget=10_000, max_messages=2) == messages[-2:]
+
+
+def test_newest_message_is_kept_over_budget():
+    messages = conversation(3)
+    assert HistoryManager(10).window("c", messages, token_budget=1) == messages[-1:]
+
+
+def test_serialize_is_compact_json_of_the_window():
+    messages = conversation(3)
+    manager = HistoryManager(10)
+    serialized = manager.serialize("c", messages, token_budget=10_000, max_messages=1)
+    assert serialized == '[{"role":"user","content":"message number 2"}]'
+    assert manager.serialize("c", messages, token_budget=10_000, max_messages=1) is serialized
+
+
+def test_least_recent_conversations_are_forgotten():
+    manager = HistoryManager(2)
+    for conversation_id in ("a", "b", "c"):
+        manager.window(conversation_id, conversation(1), token_budget=100)
+    assert list(manager._conversations) == ["b", "c"]
+    manager.forget("b")
+    assert list(manager._conversations) == ["c"]
@@ -0,0 +1,73 @@
+import json
+import os
+import pytest
+from services.intent_matcher_service import IntentMatcher
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "intent_rules.json")
+
+with open(RULES_PATH) as f:
+    EXAMPLES = json.load(f)["embedding"]["examples"]
+
+# Messages that give the new value are not change requests (see CHANGE_CONFIRMATION_CHECKER)
+VALUE_CARRYING = [
+    "change price to 50",
+    "I want to change the price to 50",
+    "the price should be 20",
+    "update product name to daily5gb",
+    "change price mode to normal",
+    "set data allowance to 5GB",
+    "change the voice minutes to 1000",
+]
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return IntentMatcher(RULES_PATH, use_embeddings=False)
+
+
+def history(text):
+    return json.dumps([
+        {"role": "assistant", "content": "Here is the product summary, shall I create it?"},
+        {"role": "user", "content": text},
+    ])
+
+
+@pytest.mark.parametrize("check", ["confirmation", "change"])
+def test_rule_samples_are_never_contradicted(matcher, check):
+    for value in (True, False):
+        for text in EXAMPLES[check][str(value).lower()]:
+            assert matcher.match(check, history(text)) in (value, None), text
+
+
+@pytest.mark.parametrize("text", VALUE_CARRYING)
+def test_value_carrying_messages_are_not_change_requests(matcher, text):
+    assert matcher.match("change", history(text)) is not True
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("yes", True),
+    ("ok thanks", True),
+    ("no", False),
+    ("wait", False),
+    ("no, the price is wrong", False),
+    ("no problem, go ahead", None),
+    ("No worries, create it", None),
+])
+def test_confirmation_rules(matcher, text, expected):
+    assert matcher.match("confirmation", history(text)) is expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("change the price", True),
+    ("I want to change the price", True),
+    ("the data allowance is wrong", True),
+    ("fix the voice minutes", True),
+    ("yes", False),
+    ("Correct, create the data plan", None),
+])
+def test_change_rules(matcher, text, expected):
+    assert matcher.match("change", history(text)) is expected
+
+
+def test_long_messages_are_left_to_the_llm(matcher):
+    assert matcher.match("confirmation", history("yes " + "a" * 200)) is None
@@ -0,0 +1,35 @@
+import pytest
+from utils.prompt_builder import compile_prompt
+
+TEMPLATE = "Extract the plan from {history}.\nThe current plan is {plan!r}, priced at {price:>6}. Use {history} only."
+
+
+def test_render_matches_str_format():
+    values = {"history": "[]", "plan": {"name": "basic"}, "price": 10}
+    assert compile_prompt(TEMPLATE).render(**values) == TEMPLATE.format(**values)
+
+
+def test_system_prompt_does_not_depend_on_values():
+    prompt = compile_prompt(TEMPLATE, "You are a helpful assistant.")
+    first = prompt.messages(history="[]", plan={}, price=1)
+    second = prompt.messages(history='[{"role":"user"}]', plan={"a": 1}, price=2)
+    assert first[0] == second[0]
+    assert first[0]["content"].startswith("You are a helpful assistant.\n\n")
+    assert "Use <history> only." in first[0]["content"]
+
+
+def test_each_field_is_sent_once_in_the_user_message():
+    prompt = compile_prompt(TEMPLATE)
+    assert prompt.fields == ("history", "plan", "price")
+    content = prompt.user_content(history="[]", plan="p", price=5)
+    assert content == "<history>\n[]\n</history>\n\n<plan>\n'p'\n</plan>\n\n<price>\n     5\n</price>"
+
+
+def test_missing_value_raises_key_error():
+    with pytest.raises(KeyError):
+        compile_prompt(TEMPLATE).render(history="[]", plan="p")
+
+
+def test_templates_are_compiled_once():
+    assert compile_prompt(TEMPLATE) is compile_prompt(TEMPLATE)
+    assert compile_prompt(TEMPLATE) is not compile_prompt(TEMPLATE, "preamble")
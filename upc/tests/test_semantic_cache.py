@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from services.semantic_cache_service import SemanticCache
+
+VECTORS = {
+    "how do I create a plan": [1.0, 0.0, 0.0, 0.0],
+    "how can I create a plan": [0.99, 0.1, 0.0, 0.0],
+    "what is the weather": [0.0, 0.0, 1.0, 0.0],
+}
+
+
+def embed(text):
+    return np.array(VECTORS[text.strip()], dtype=np.float32)
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache("test", embed, dimension=4, max_entries=10, ttl_seconds=3600, ann_threshold=100)
+
+
+def test_exact_tier_matches_normalized_prompt_without_encoding(cache):
+    cache.add("how do I create a plan", "answer")
+    # Extra whitespace hashes the same, and an unknown text would fail embed()
+    assert cache.lookup("how  do I create   a plan ", 0.9) == "answer"
+    assert cache.stats["exact_hits"] == 1
+    assert cache.stats["semantic_hits"] + cache.stats["semantic_misses"] == 0
+
+
+def test_semantic_tier_after_exact_miss(cache):
+    cache.add("how do I create a plan", "answer")
+    assert cache.lookup("how can I create a plan", 0.9) == "answer"
+    assert cache.lookup("what is the weather", 0.9) is None
+    assert cache.stats == {"exact_hits": 0, "exact_misses": 2, "semantic_hits": 1, "semantic_misses": 1,
+                           "misses": 1}
+
+
+def test_empty_cache_is_a_final_exact_miss(cache):
+    assert cache.lookup("what is the weather", 0.9) is None
+    assert cache.stats["exact_misses"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache("test", embed, dimension=4, max_entries=1, ttl_seconds=3600, ann_threshold=100)
+    cache.add("how do I create a plan", "first")
+    cache.add("what is the weather", "second")
+    assert len(cache) == 1
+    assert cache.lookup("what is the weather", 0.9) == "second"
+    assert cache.lookup("how do I create a plan", 0.99) is None
+
+
+def test_saved_cache_is_loaded_on_restart(tmp_path):
+    cache = SemanticCache("test", embed, 4, 10, 3600, 100, persist_dir=str(tmp_path))
+    cache.add("how do I create a plan", "answer")
+    cache.save()
+    restarted = SemanticCache("test", embed, 4, 10, 3600, 100, persist_dir=str(tmp_path))
+    assert len(restarted) == 1
+    assert restarted.lookup("how can I create a plan", 0.9) == "answer"
+    # The loaded index stays writable
+    restarted.add("what is the weather", "sunny")
+    assert restarted.lookup("what is the weather", 0.9) == "sunny"
@@ -0,0 +1,53 @@
+import asyncio
+import time
+from services.state_store_service import InMemoryStateStore
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_get_returns_a_copy():
+    store = InMemoryStateStore(ttl_seconds=60, max_entries=10, max_bytes=10_000)
+    run(store.set("a", {"plan": {"price": "10"}, "message_count": 2}))
+    state = run(store.get("a"))
+    state["plan"]["price"] = "20"
+    assert run(store.get("a"))["plan"]["price"] == "10"
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    store = InMemoryStateStore(ttl_seconds=60, max_entries=10, max_bytes=10_000)
+    run(store.set("a", {"n": 1}))
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert run(store.get("a")) is None
+    assert store._total_bytes == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = InMemoryStateStore(ttl_seconds=60, max_entries=2, max_bytes=10_000)
+    run(store.set("a", {"n": 1}))
+    run(store.set("b", {"n": 2}))
+    run(store.get("a"))
+    run(store.set("c", {"n": 3}))
+    assert run(store.get("b")) is None
+    assert run(store.get("a")) == {"n": 1}
+    assert run(store.get("c")) == {"n": 3}
+
+
+def test_total_size_is_capped():
+    store = InMemoryStateStore(ttl_seconds=60, max_entries=100, max_bytes=40)
+    for key in "abcd":
+        run(store.set(key, {"value": key * 10}))
+    assert store._total_bytes <= 40
+    assert run(store.get("d")) == {"value": "dddddddddd"}
+    assert run(store.get("a")) is None
+
+
+def test_delete():
+    store = InMemoryStateStore(ttl_seconds=60, max_entries=10, max_bytes=10_000)
+    run(store.set("a", {"n": 1}))
+    run(store.delete("a"))
+    run(store.delete("missing"))
+    assert run(store.get("a")) is None
+    assert store._total_bytes == 0
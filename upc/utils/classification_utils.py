@@ -0,0 +1,30 @@
+import json
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+def _parse_history(messages: str) -> List[Dict[str, Any]]:
+    try:
+        history = json.loads(messages)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return [message for message in history if isinstance(message, dict)] if isinstance(history, list) else []
+
+
+def last_user_message(messages: str) -> Optional[str]:
+    """Returns the text of the latest user message in a serialized history, if any."""
+    for message in reversed(_parse_history(messages)):
+        if message.get("role") == "user":
+            return message.get("content") or ""
+    return None
+
+
+def has_assistant_message(messages: str) -> bool:
+    """True once the assistant has replied, i.e. the latest user message may answer a question or a plan."""
+    return any(message.get("role") == "assistant" for message in _parse_history(messages))
+
+
+def unit_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scales vectors (or each row of a matrix) to unit length, zero vectors are left as they are."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Optional
+from models.conversation_models import ConversationRequest, MessageItem
+from services.history_manager_service import history_manager, format_history
+
+# Longest message text included in log summaries
+LOG_PREVIEW_CHARS = 200
+
+
+class ConversationContext:
+    """
+    Per-request view of a conversation shared by every pipeline stage.
+
+    The messages are formatted once when first needed and every history window
+    is serialized once (compact JSON, through the history manager cache), so
+    the classifier, plan extraction and confirmation checks reuse the same
+    strings instead of rebuilding them.
+    """
+
+    def __init__(self, request: ConversationRequest):
+        self.request = request
+        self.conversation_id = request.conversationId
+        self._messages: Optional[List[Dict[str, str]]] = None
+
+    @property
+    def messages(self) -> List[Dict[str, str]]:
+        """All messages including the current one, as role/content dicts."""
+        if self._messages is None:
+            self._messages = format_history(self.request.previousMessages + [self.request.currentMessage])
+        return self._messages
+
+    def window(self, token_budget: int, max_messages: Optional[int] = None, start: int = 0) -> List[Dict[str, str]]:
+        """Most recent messages from start on that fit in token_budget."""
+        return history_manager.window(self.conversation_id, self.messages[start:], token_budget, max_messages)
+
+    def history(self, token_budget: int, max_messages: Optional[int] = None, start: int = 0) -> str:
+        """Same as window, serialized for use in a prompt."""
+        return history_manager.serialize(self.conversation_id, self.messages[start:], token_budget, max_messages)
+
+
+def _preview(message: MessageItem) -> str:
+    text = message.payload.text or ""
+    if message.messageType == "image":
+        # The base64 data is in payload.image, the controller still accepts it in payload.text
+        return f"<image {len(message.payload.image or text)} chars>"
+    if len(text) > LOG_PREVIEW_CHARS:
+        return f"{text[:LOG_PREVIEW_CHARS]}... <{len(text)} chars>"
+    return text
+
+
+def summarize_request(request: ConversationRequest) -> Dict[str, Any]:
+    """Loggable summary of a request, with images and long texts reduced to their size."""
+    return {
+        "conversationId": request.conversationId,
+        "messageId": request.currentMessage.messageId,
+        "messageType": request.currentMessage.messageType,
+        "text": _preview(request.currentMessage),
+        "previousMessages": len(request.previousMessages),
+    }
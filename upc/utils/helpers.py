@@ -1,11 +1,39 @@
 import json
-from services.ai_client_service import make_classification_call
+from services.ai_client_service import make_classification_call, make_classification_call_async
+from services.local_classifier_service import PRODUCT_RELATED, LocalPrediction, classify_locally, classify_locally_async
+from utils.classification_utils import has_assistant_message, last_user_message
 from utils.prompts import PRODUCT_CONVERSATION_CLASSIFIER_PROMPT
 from upc.logger import setup_logger
+from upc.metric_logger import MetricLogger
 import time
+from typing import Optional
 logger = setup_logger(__name__)
 
 
+def _record_classification(source: str, product_related: bool, prediction: Optional[LocalPrediction] = None) -> None:
+    data = {"source": source, "product_related": product_related}
+    if prediction is not None:
+        data.update({"local_label": prediction.label, "similarity": round(prediction.similarity, 4),
+                     "margin": round(prediction.margin, 4)})
+    MetricLogger().log_event("product_classification", additional_data=data)
+
+
+def _fallback(prediction: Optional[LocalPrediction]) -> bool:
+    """Answer when the LLM classifier fails: the local guess if there is one, else product related."""
+    return prediction.label == PRODUCT_RELATED if prediction is not None else True
+
+
+def _local_candidate(message: str) -> Optional[str]:
+    """
+    Text for the local classifier, None once the assistant has replied: mid-flow
+    answers like "yes", "199" or "GSM" only make sense with the preceding
+    context, which the LLM prompt sees and the local classifier doesn't.
+    """
+    if has_assistant_message(message):
+        return None
+    return last_user_message(message)
+
+
 def is_product_related(message: str) -> bool:
     """
     Check if the given message is related to product creation using LLM.
@@ -14,6 +42,17 @@ def is_product_related(message: str) -> bool:
     start_time = time.time()
     logger.info("Starting product classification check")
 
+    text = _local_candidate(message)
+    prediction = None
+    try:
+        prediction = classify_locally(text) if text else None
+    except Exception as e:
+        logger.error(f"Local classification failed: {str(e)}", exc_info=True)
+    if prediction is not None and prediction.confident:
+        logger.info(f"Message classified locally as {prediction.label} in {time.time() - start_time:.3f} seconds")
+        _record_classification("local", prediction.label == PRODUCT_RELATED, prediction)
+        return prediction.label == PRODUCT_RELATED
+
     prompt = PRODUCT_CONVERSATION_CLASSIFIER_PROMPT.format(message=message)
     response_data = None
     response = None
@@ -37,6 +76,7 @@ def is_product_related(message: str) -> bool:
         total_time = end_time - start_time
         logger.info(f"Total classification process took {total_time:.2f} seconds")
         logger.info(f"Message classified as: {classification}")
+        _record_classification("llm", classification == 'product_related', prediction)
 
         return classification == 'product_related'
 
@@ -45,17 +85,60 @@ def is_product_related(message: str) -> bool:
         logger.debug(f"Raw response that caused the error: {response}")
         end_time = time.time()
         logger.error(f"Process failed after {end_time - start_time:.2f} seconds")
-        return True
+        return _fallback(prediction)
 
     except KeyError as e:
         logger.error(f"KeyError in classification response: {str(e)}")
         logger.debug(f"Response data that caused the error: {response_data}")
         end_time = time.time()
         logger.error(f"Process failed after {end_time - start_time:.2f} seconds")
-        return True
+        return _fallback(prediction)
 
     except Exception as e:
         logger.error(f"Unexpected error in classification: {str(e)}", exc_info=True)
         end_time = time.time()
         logger.error(f"Process failed after {end_time - start_time:.2f} seconds")
-        return True
\ No newline at end of file
+        return _fallback(prediction)
+
+
+async def is_product_related_async(message: str) -> bool:
+    """
+    Async counterpart of is_product_related, awaits the classification call
+    instead of blocking the event loop.
+    """
+    start_time = time.time()
+    logger.info("Starting async product classification check")
+
+    text = _local_candidate(message)
+    prediction = None
+    try:
+        prediction = await classify_locally_async(text) if text else None
+    except Exception as e:
+        logger.error(f"Local classification failed: {str(e)}", exc_info=True)
+    if prediction is not None and prediction.confident:
+        logger.info(f"Message classified locally as {prediction.label} in {time.time() - start_time:.3f} seconds")
+        _record_classification("local", prediction.label == PRODUCT_RELATED, prediction)
+        return prediction.label == PRODUCT_RELATED
+
+    prompt = PRODUCT_CONVERSATION_CLASSIFIER_PROMPT.format(message=message)
+    response = None
+
+    try:
+        response = await make_classification_call_async(prompt)
+        logger.debug(f"Received classification response: {response}")
+        classification = json.loads(response)['classification']
+        logger.info(f"Total classification process took {time.time() - start_time:.2f} seconds")
+        logger.info(f"Message classified as: {classification}")
+        _record_classification("llm", classification == 'product_related', prediction)
+        return classification == 'product_related'
+
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        logger.error(f"Error parsing classification response: {str(e)}")
+        logger.debug(f"Raw response that caused the error: {response}")
+        logger.error(f"Process failed after {time.time() - start_time:.2f} seconds")
+        return _fallback(prediction)
+
+    except Exception as e:
+        logger.error(f"Unexpected error in classification: {str(e)}", exc_info=True)
+        logger.error(f"Process failed after {time.time() - start_time:.2f} seconds")
+        return _fallback(prediction)
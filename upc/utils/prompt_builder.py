@@ -0,0 +1,67 @@
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, List, Tuple
+
+_formatter = Formatter()
+
+
+class CompiledPrompt:
+    """
+    A Prompts template parsed once and laid out for provider-side prefix caching.
+
+    Every replacement field in the template is replaced by a <field> reference,
+    so the instructions form a static system message that is byte-identical on
+    every call. The values are sent afterwards in a short user message, one
+    <field>...</field> block each. Providers that cache prompt prefixes can then
+    reuse the whole instruction block and only process the values.
+    """
+
+    def __init__(self, template: str, system_preamble: str = ""):
+        self.template = template
+        # (literal text, field name, format spec, conversion) as parsed once
+        self._parts: List[Tuple[str, Any, Any, Any]] = list(_formatter.parse(template))
+        self.fields: Tuple[str, ...] = tuple(dict.fromkeys(
+            field for _, field, _, _ in self._parts if field is not None))
+        static = "".join(
+            literal + (f"<{field}>" if field is not None else "") for literal, field, _, _ in self._parts
+        ).strip()
+        if self.fields:
+            references = ", ".join(f"<{field}>" for field in self.fields)
+            static += f"\n\nThe values for {references} are given in the user message."
+        self.system_prompt = f"{system_preamble}\n\n{static}" if system_preamble else static
+
+    def _values(self, values: Dict[str, Any]) -> Dict[str, str]:
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise KeyError(missing[0])
+        formatted = {}
+        for _, field, format_spec, conversion in self._parts:
+            if field is not None and field not in formatted:
+                value = _formatter.convert_field(values[field], conversion)
+                formatted[field] = _formatter.format_field(value, format_spec or "")
+        return formatted
+
+    def user_content(self, **values: Any) -> str:
+        """The dynamic suffix: the values wrapped in tags matching the references in the system prompt."""
+        formatted = self._values(values)
+        return "\n\n".join(f"<{field}>\n{formatted[field]}\n</{field}>" for field in self.fields)
+
+    def messages(self, **values: Any) -> List[Dict[str, str]]:
+        """Chat messages with the static system prefix first and the values last."""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.user_content(**values)}
+        ]
+
+    def render(self, **values: Any) -> str:
+        """The template filled in as one string, same as str.format, for cache keys and logging."""
+        formatted = self._values(values)
+        return "".join(
+            literal + (formatted[field] if field is not None else "") for literal, field, _, _ in self._parts
+        )
+
+
+@lru_cache(maxsize=None)
+def compile_prompt(template: str, system_preamble: str = "") -> CompiledPrompt:
+    """Returns the compiled form of a template, parsing each template only once."""
+    return CompiledPrompt(template, system_preamble)
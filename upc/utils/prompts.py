@@ -272,6 +272,25 @@ Note: please format the expected output with correct new lines"""
     """
      
    
+    PRODUCT_INFO_PATCH = """
+Update a product plan based on the user's latest message. Reply ONLY with the fields that change.
+
+**Current plan:**
+{current_plan}
+
+**Latest user message:**
+{latest_message}
+
+**Rules:**
+1. Set a field ONLY if the latest message gives it a new value, leave every other field null.
+2. If the user asks to change a field WITHOUT giving a new value (e.g. "change price_mode"), add its name to cleared_fields.
+3. If product_name changes, set product_description to the same value.
+4. product_offer_price must be a numeric string with no currency or units (e.g. "10").
+5. Data allowance looks like "20 GB" or "10 MB", voice allowance like "100 minutes" or "flexi minutes".
+   Days or months are validity, not data or voice allowance.
+6. Never invent values that are not in the latest message.
+"""
+
     PRODUCT_INFO_EXTRACTION_new = """
             Extract the following information from the conversation and format it as JSON. Use the exact field names from the provided schema. 
         **IF THE USER REQUESTS A FIELD TO BE CHANGED WITHOUT SPECIFYING A NEW VALUE, SET THAT FIELD TO NULL. DO NOT SKIP THIS RULE UNDER ANY CIRCUMSTANCES..**
@@ -414,6 +433,38 @@ CRITICAL CHECKS:
 
 Please analyze the image again and confirm the exact number written for the price."""
      
+    COMBINED_INTENT_ROUTER = """
+You are routing a product creation conversation. Analyze the conversation and answer ALL of the following in one JSON object.
+
+1. classification:
+   - "product_related" if the conversation contains ANY specific product details (data amounts, prices, names, validity),
+     a request to update/modify/change product parameters, a direct reply to a product details summary,
+     or a confirmation such as "proceed" or "yes" after product details were shown.
+   - "general_conversation" for greetings, vague statements like "I want to create a product", or questions about the process.
+
+2. confirmed:
+   - true ONLY if the LAST user message explicitly says "yes", "proceed", "confirm" or similar AFTER the assistant showed the full product details.
+   - false if the user asks for changes, provides new details, or has not been shown all details yet.
+   - Recurring or Non-Recurring is not a confirmation.
+
+3. change_requested:
+   - true ONLY if the LAST user message asks to change, modify or update an EXISTING product field WITHOUT giving the new value
+     (e.g. "change the price mode", "update the product name").
+   - false if the user gives the new value in the same message (e.g. "change price mode to normal", "set data allowance to 5GB"),
+     is creating a product for the first time, or is confirming.
+
+4. field_to_change:
+   - When change_requested is true, the schema field the user wants to change, one of:
+     product_name, product_description, product_family, product_group, product_offer_price, pop_type,
+     price_category, price_mode, product_specification_type, data_allowance, voice_allowance
+   - Otherwise an empty string.
+
+Conversation:
+{messages}
+
+Respond in JSON format only.
+"""
+
     FIELD_EXTRACTION = """Based on the user's conversation, identify the field they want to change from the product details.
 Focus on explicit mentions like "change the price mode" or "update the description."
 Do not infer any additional fields not mentioned.
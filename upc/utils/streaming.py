@@ -0,0 +1,50 @@
+import asyncio
+import json
+from typing import Awaitable, Callable
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from models.response_models import PlanResponse
+from services.ai_client_service import TokenCallback
+from upc.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def stream_plan_response(run: Callable[[TokenCallback], Awaitable[PlanResponse]]) -> StreamingResponse:
+    """
+    Runs a request handler with a token callback and streams its output as JSON lines.
+
+    Every streamed content delta is sent as {"type": "token", "text": ...} as soon as the
+    provider produces it, followed by one {"type": "response", "data": <PlanResponse>} line
+    with the usual envelope, or {"type": "error", "detail": ...} if the handler failed.
+    """
+    async def generate():
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def on_token(text: str) -> None:
+            await queue.put(text)
+
+        task = asyncio.create_task(run(on_token))
+        # Runs after the handler returned, so every token is already queued ahead of it
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                token = await queue.get()
+                if token is None:
+                    break
+                yield json.dumps({"type": "token", "text": token}) + "\n"
+
+            try:
+                response = task.result()
+                yield json.dumps({"type": "response", "data": response.model_dump(mode="json")}) + "\n"
+            except HTTPException as e:
+                yield json.dumps({"type": "error", "detail": e.detail}) + "\n"
+            except Exception as e:
+                logger.error(f"Error in streamed request: {str(e)}", exc_info=True)
+                yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            # Client went away before the handler finished
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")